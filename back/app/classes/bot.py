@@ -0,0 +1,31 @@
+import uuid
+
+from app.classes.player import Player
+
+# tier: faixa de raridade das palavras (0 = comuns, 2 = raras)
+# think_time: intervalo (s) de "pensamento" antes de enviar uma palavra
+# error_rate: chance de enviar uma palavra errada de propósito
+BOT_SKILLS = {
+    "easy": {"tier": 0, "think_time": (4.0, 10.0), "error_rate": 0.25},
+    "medium": {"tier": 1, "think_time": (2.0, 6.0), "error_rate": 0.1},
+    "hard": {"tier": 2, "think_time": (0.8, 3.0), "error_rate": 0.02},
+}
+
+BOT_NAMES = ["Torre", "Letrinha", "Dicionário", "Verbete", "Sílaba", "Vogal", "Acento", "Rima"]
+
+
+class BotPlayer(Player):
+    """Server-side player that submits words through the normal game rules."""
+
+    def __init__(self, name: str, skill: str = "medium"):
+        bot_id = str(uuid.uuid4())
+        super().__init__(name, f"bot:{bot_id}", is_host=False)
+        self.is_bot = True
+        self.skill = skill if skill in BOT_SKILLS else "medium"
+
+    @property
+    def settings(self) -> dict:
+        return BOT_SKILLS[self.skill]
+
+    def __str__(self):
+        return f"BotPlayer({self.name}, skill: {self.skill}, active: {self.is_active})"
@@ -0,0 +1,1579 @@
+import asyncio
+import hmac
+import itertools
+import logging
+import random
+import secrets
+import time
+from collections import Counter
+from typing import Optional
+
+from app.utils.clock import SystemClock
+from app.utils.ngram_index import word_grams
+from app.utils.room_snapshot import restore_fields, restore_players, restore_used, snapshot_room
+from app.utils.scoring import speed_bonus
+from app.utils.suggestions import get_suggestions
+from app.utils.tracing import create_detached_task, traced, tracer
+from app.utils.dictionary import (
+    DEFAULT_LANGUAGE, AnyDictionary, registry, verify_word, get_random_word, strip_accents
+)
+from app.classes.player import Player
+from app.classes.room_actor import QueueMetrics, RoomActor, RoomBusy
+
+logger = logging.getLogger(__name__)
+
+TURN_TIME_LIMIT = 30
+PENALTY_TIME = 5
+MIN_TIME_REMAINING = 3
+MAX_PLAYERS = 12
+
+# Códigos de rejeição usados nos eventos internos e mensagens enviadas aos jogadores
+REJECT_REASONS = {
+    "not_in_dictionary": "Word not found in dictionary",
+    "already_used": "Word already used in this game",
+    "wrong_letter": "Word must start with '{letter}'",
+    "missing_fragment": "Word must contain '{letter}'",
+    "round_closed": "Round already won by another player",
+}
+
+DIFFICULTIES = ("normal", "easy", "caotic", "fragment")
+# "elimination": perde quem erra o tempo; "points": vence quem somar mais pontos em round_limit rodadas;
+# "speed": todos disputam a mesma letra ao mesmo tempo e a primeira palavra válida leva a rodada
+GAME_MODES = ("elimination", "points", "speed")
+ROUND_LIMIT = 5
+MAX_ROUND_LIMIT = 50
+SPEED_MAX_PLAYERS = 200
+# Pausa entre rodadas do modo speed; envios nesse intervalo são recusados sem consultar o dicionário
+SPEED_ROUND_PAUSE = 2
+# Uma sala recebida de outro worker volta a correr quando todos os humanos reconectam, ou após este tempo
+MIGRATION_GRACE = 5
+
+
+class NullTransport:
+    """Transport that discards every message, for headless runs."""
+
+    def __init__(self):
+        self.emitted = 0
+
+    async def emit(self, message: dict, room: str = None, to: str = None):
+        self.emitted += 1
+
+    async def join(self, sid: str, game_id: str, session: dict):
+        pass
+
+
+class GameEngine:
+    """
+    Game rules for Word Tower as a transport-agnostic state machine.
+
+    Outgoing events go through the injected transport and every timer uses the
+    injected clock, so the rules run the same behind Socket.IO, in tests or in
+    the headless simulator.
+    """
+    
+    def __init__(self, transport, clock=None):
+        self.transport = transport
+        self.clock = clock or SystemClock()
+        self.rooms: dict[str, dict] = {}
+        self.timer_tasks: dict[str, asyncio.Task] = {}
+        # Um ator por sala: todos os comandos de uma sala rodam em ordem, sem se intercalar
+        self.actors: dict[str, RoomActor] = {}
+        # Contadores das filas somados entre as salas (o /metrics não expõe uma série por sala)
+        self.queue_metrics = QueueMetrics()
+        # Identifica o turno de cada timer; ticks de um turno que já acabou são ignorados
+        self._turn_tokens = itertools.count(1)
+        # Durante o drain: endereço do worker que recebe as salas (novas salas vão direto para lá)
+        self.drain_redirect: Optional[str] = None
+        # Consumidores de eventos internos (log de eventos, estatísticas...)
+        self.event_sinks: list = []
+
+    def _publish_event(self, game_id: str, event_type: str, data: dict):
+        """Forward a state-changing event to every registered sink. A failing sink never aborts the command."""
+        for sink in self.event_sinks:
+            try:
+                sink.record(game_id, event_type, data)
+            except Exception:
+                logger.exception("Event sink %s failed on %s for room %s", type(sink).__name__, event_type, game_id)
+
+    def _room_changed(self, game_id: str):
+        """Publish the room summary used by the lobby indexes."""
+        room = self.rooms.get(game_id)
+        if not room:
+            self._publish_event(game_id, "room_closed", {})
+            return
+        
+        host = next((p.name for p in room["players"] if p.is_host), None)
+        self._publish_event(game_id, "room_updated", {
+            "game_state": room["game_state"],
+            "difficulty": room["difficulty"],
+            "players": len(room["players"]),
+            "max_players": room["settings"]["max_players"],
+            "host": host,
+            "tournament": room.get("tournament_id") is not None
+        })
+
+    async def _run_command(self, game_id: str, command, *args, sid: str = None, busy_result=None):
+        """Apply a command to a room through its actor and return the command result."""
+        actor = self.actors.get(game_id)
+        if actor is None:
+            actor = self.actors[game_id] = RoomActor(game_id, on_idle=self._actor_idle, metrics=self.queue_metrics)
+        try:
+            return await actor.call(command, *args)
+        except RoomBusy:
+            logger.warning(f"⚠️ Command queue full for room {game_id}, refusing {command.__name__}")
+            if sid:
+                await self.transport.emit({"type": "error", "message": "Room is busy, try again"}, to=sid)
+            return busy_result
+
+    def _actor_idle(self, actor: RoomActor):
+        # Sala fechada e fila vazia: o ator pode ir embora
+        if actor.game_id not in self.rooms and self.actors.get(actor.game_id) is actor:
+            del self.actors[actor.game_id]
+
+    def command_queue_stats(self) -> dict[str, dict]:
+        """Queue depth and counters of every room actor."""
+        return {game_id: actor.stats() for game_id, actor in self.actors.items()}
+
+    # Comandos públicos: cada um entra na fila da sala e roda sozinho
+    async def connect(self, game_id: str, sid: str, player_name: str) -> bool:
+        """Connect a player to a game room. Returns whether the player got in."""
+        return bool(await self._run_command(game_id, self._connect, game_id, sid, player_name, sid=sid))
+
+    def reserve_room(self, game_id: str, tournament_id: str):
+        """Create a tournament room before its players connect; it never shows up in the lobby."""
+        self._ensure_room(game_id)
+        self.rooms[game_id]["tournament_id"] = tournament_id
+        self._room_changed(game_id)
+
+    async def add_player(self, game_id: str, player: Player):
+        """Add an already created player (human or bot) to an existing room."""
+        await self._run_command(game_id, self._add_player, game_id, player)
+
+    async def disconnect(self, game_id: str, sid: str):
+        """Disconnect a player from a game room."""
+        await self._run_command(game_id, self._disconnect, game_id, sid)
+
+    async def eliminate_player(self, game_id: str, player_name: str):
+        """Eliminate a player from the current round by name."""
+        await self._run_command(game_id, self._eliminate_player, game_id, player_name)
+
+    async def eliminate_player_by_id(self, game_id: str, player_id: str):
+        """Eliminate a player from the current round by ID."""
+        await self._run_command(game_id, self._eliminate_player_by_id, game_id, player_id)
+
+    async def reset_game(self, game_id: str):
+        """Reset the game to waiting state after victory."""
+        await self._run_command(game_id, self._reset_game, game_id)
+
+    async def start_new_game(self, game_id: str, requesting_player_sid: str = None):
+        """Start a new game with a random word."""
+        return await self._run_command(game_id, self._start_new_game, game_id, requesting_player_sid,
+                                       busy_result=(False, "Room is busy, try again"))
+
+    async def handle_word_submission(self, game_id: str, sid: str, word: str):
+        """Process a word submission from a player."""
+        await self._run_command(game_id, self._handle_word_submission, game_id, sid, word, sid=sid)
+
+    async def change_room_difficulty(self, game_id: str, difficulty: str, requesting_player_sid: str):
+        """Change room difficulty - only when game is not in progress."""
+        return await self._run_command(game_id, self._change_room_difficulty, game_id, difficulty,
+                                       requesting_player_sid, busy_result=(False, "Room is busy, try again"))
+
+    async def update_room_settings(self, game_id: str, settings: dict, requesting_player_sid: str):
+        """Update room settings (time and difficulty) - can be changed at any time by host."""
+        return await self._run_command(game_id, self._update_room_settings, game_id, settings,
+                                       requesting_player_sid, busy_result=(False, "Room is busy, try again"))
+
+    async def rejoin(self, game_id: str, sid: str, player_id: str, secret: str):
+        """Reattach a player (new socket, same player id) to a room migrated from another worker."""
+        return await self._run_command(game_id, self._rejoin, game_id, sid, player_id, secret, sid=sid, busy_result=False)
+
+    async def export_room(self, game_id: str) -> Optional[dict]:
+        """Freeze a room for migration and return its snapshot."""
+        return await self._run_command(game_id, self._export_room, game_id)
+
+    async def complete_export(self, game_id: str, url: str):
+        """The peer took the room: send its clients there and drop it here."""
+        await self._run_command(game_id, self._complete_export, game_id, url)
+
+    async def abort_export(self, game_id: str):
+        """The peer refused the room: unfreeze it and keep playing here."""
+        await self._run_command(game_id, self._abort_export, game_id)
+
+    async def import_room(self, snapshot: dict) -> bool:
+        """Recreate a room from another worker's snapshot."""
+        return await self._run_command(snapshot["game_id"], self._import_room, snapshot, busy_result=False)
+
+    async def _connect(self, game_id: str, sid: str, player_name: str):
+        if self.drain_redirect:
+            if game_id not in self.rooms:
+                # Worker em drain não cria salas: o cliente entra direto no outro worker
+                await self.transport.emit({
+                    "type": "migrate", "url": self.drain_redirect, "game_id": game_id, "rejoin": False
+                }, to=sid)
+                return False
+            if self.rooms[game_id].get("migrating"):
+                await self.transport.emit({"type": "error", "message": "Room is moving to another server, try again"}, to=sid)
+                return False
+        self._ensure_room(game_id)
+        
+        if len(self.rooms[game_id]["players"]) >= self.rooms[game_id]["settings"]["max_players"]:
+            await self.transport.emit({
+                "type": "error",
+                "message": "Room is full"
+            }, to=sid)
+            return False
+        
+        is_host = len(self.rooms[game_id]["players"]) == 0
+        player = Player(player_name, sid, is_host)
+        
+        await self.transport.join(sid, game_id, {
+            "game_id": game_id, 
+            "player_name": player_name,
+            "player_id": player.id
+        })
+        await self._add_player(game_id, player)
+        return True
+
+    def _ensure_room(self, game_id: str):
+        """Create the room with default settings if it does not exist yet."""
+        if game_id not in self.rooms:
+            self.rooms[game_id] = {
+                "players": [],
+                "current_word": "",
+                "game_state": "waiting",
+                "round_number": 1,
+                "difficulty": "normal",
+                "language": DEFAULT_LANGUAGE,
+                # Versão do dicionário fixada no início da partida (None fora de jogo)
+                "dictionary": None,
+                "current_player_index": 0,
+                "turn_order": [],
+                "used_words": set(),
+                # Fragmentos das palavras usadas (modo "fragment"), para contar as palavras restantes em O(1)
+                "used_grams": Counter(),
+                "turn_start_time": None,
+                "turn_token": 0,
+                "remaining_time": TURN_TIME_LIMIT,
+                # Modo da partida em andamento (copiado de settings no início) e turnos jogados
+                "mode": "elimination",
+                "turns_taken": 0,
+                "settings": {
+                    "default_time": TURN_TIME_LIMIT,
+                    "difficulty": "normal",
+                    "language": DEFAULT_LANGUAGE,
+                    "max_players": MAX_PLAYERS,
+                    "mode": "elimination",
+                    "round_limit": ROUND_LIMIT
+                }
+            }
+
+    async def _add_player(self, game_id: str, player: Player):
+        """Add an already created player (human or bot) to an existing room."""
+        if self.rooms[game_id]["game_state"] == "playing":
+            player.is_active = False
+        
+        self.rooms[game_id]["players"].append(player)
+        self._room_changed(game_id)
+        
+        if self.rooms[game_id]["game_state"] == "waiting":
+            self.rooms[game_id]["turn_order"] = [p.id for p in self.rooms[game_id]["players"] if p.is_active]
+        
+        room_settings = self.rooms[game_id]["settings"]
+        logger.info(f"⚙️ Enviando configurações da sala {game_id}: {room_settings}")
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "player_joined",
+            "player": player.name,
+            "player_id": player.id,
+            "players": self.get_players_info(game_id),
+            "total_players": len(self.rooms[game_id]["players"]),
+            "difficulty": self.rooms[game_id]["difficulty"],
+            "game_state": self.rooms[game_id]["game_state"],
+            "current_player": self.get_current_player_info(game_id),
+            "is_active": player.is_active,
+            "room_settings": room_settings  # Enviar configurações da sala
+        })
+
+    async def _disconnect(self, game_id: str, sid: str):
+        """Disconnect a player from a game room."""
+        if game_id not in self.rooms:
+            return
+        
+        room = self.rooms[game_id]
+        
+        disconnected_player = None
+        player_name = None
+        was_host = False
+        was_current_player = False
+        
+        current_player_info = self.get_current_player_info(game_id) if room["game_state"] == "playing" else None
+        
+        for i, player in enumerate(room["players"]):
+            if player.websocket == sid:
+                disconnected_player = player
+                player_name = player.name
+                was_host = player.is_host
+                # No modo speed não há vez: a rodada compartilhada continua
+                was_current_player = (current_player_info and player.id == current_player_info["id"]
+                                      and room.get("mode") != "speed")
+                room["players"].pop(i)
+                break
+        
+        if not disconnected_player:
+            return
+        
+        if was_host and room["players"]:
+            # Bots nunca viram host; prefere o primeiro jogador humano
+            new_host = next((p for p in room["players"] if not p.is_bot), room["players"][0])
+            new_host.is_host = True
+        
+        remaining_players = len(room["players"])
+        
+        if room["game_state"] == "playing":
+            if disconnected_player.is_active:
+                self._publish_event(game_id, "player_eliminated", {
+                    "player_id": disconnected_player.id,
+                    "player": player_name,
+                    "reason": "disconnected"
+                })
+            
+            active_players = [p for p in room["players"] if p.is_active]
+            
+            if len(active_players) <= 1:
+                winner = active_players[0] if active_players else None
+                logger.info(f"🏆 Victory condition met after disconnect - Winner: {winner.name if winner else 'None'}")
+                await self._declare_victory(game_id, winner)
+            elif remaining_players < 2:
+                self._stop_turn_timer(game_id)
+                room["game_state"] = "waiting"
+                room["current_word"] = ""
+                room["turn_order"] = []
+                room["current_player_index"] = 0
+                room["used_words"] = set()
+                room["used_grams"] = Counter()
+                room["dictionary"] = None
+                
+                await self.broadcast_to_room(game_id, {
+                    "type": "game_ended",
+                    "reason": "Insufficient players (minimum 2 required)",
+                    "players": self.get_players_info(game_id)
+                })
+            else:
+                if was_current_player:
+                    logger.info("🔄 Current player disconnected, advancing turn")
+                    self._stop_turn_timer(game_id)
+                    self.advance_turn(game_id)
+                    next_player = self.get_current_player_info(game_id)
+                    if next_player:
+                        logger.info(f"⏰ Starting timer for next player: {next_player['name']}")
+                        await self._start_turn_timer(game_id)
+                    else:
+                        logger.info("❌ No next player found after advancing turn")
+                else:
+                    logger.info("🔄 Non-current player disconnected, updating turn order")
+                    room["turn_order"] = [p.id for p in active_players]
+                    if room.get("current_player_index", 0) >= len(room["turn_order"]):
+                        room["current_player_index"] = 0
+                        logger.info("🔧 Reset player index to 0 due to out of bounds")
+                
+                await self.broadcast_to_room(game_id, {
+                    "type": "player_left",
+                    "player": player_name,
+                    "players": self.get_players_info(game_id),
+                    "total_players": remaining_players,
+                    "current_player": self.get_current_player_info(game_id),
+                    "was_current_player": was_current_player
+                })
+        else:
+            await self.broadcast_to_room(game_id, {
+                "type": "player_left",
+                "player": player_name,
+                "players": self.get_players_info(game_id),
+                "total_players": remaining_players,
+                "current_player": self.get_current_player_info(game_id)
+            })
+        
+        if not any(not p.is_bot for p in room["players"]):
+            # Sala sem jogadores humanos: os bots saem junto
+            self._stop_turn_timer(game_id)
+            del self.rooms[game_id]
+        
+        self._room_changed(game_id)
+
+    async def _eliminate_player(self, game_id: str, player_name: str):
+        """Eliminate a player from the current round by name."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+        
+        eliminated_player = None
+        for player in room["players"]:
+            if player.name == player_name:
+                player.is_active = False
+                eliminated_player = player
+                break
+        
+        if eliminated_player:
+            await self._handle_player_elimination(game_id, eliminated_player, "eliminated")
+    
+    async def _eliminate_player_by_id(self, game_id: str, player_id: str):
+        """Eliminate a player from the current round by ID."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+        
+        eliminated_player = None
+        for player in room["players"]:
+            if player.id == player_id:
+                player.is_active = False
+                eliminated_player = player
+                break
+        
+        if eliminated_player:
+            await self._handle_player_elimination(game_id, eliminated_player, "eliminated")
+    
+    async def _handle_player_elimination(self, game_id: str, eliminated_player, reason: str = "eliminated"):
+        """Handle the elimination logic after a player is marked as inactive."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+        
+        self._publish_event(game_id, "player_eliminated", {
+            "player_id": eliminated_player.id,
+            "player": eliminated_player.name,
+            "reason": reason
+        })
+        
+        # O jogador já foi marcado como inativo, então get_current_player_info não o encontra mais
+        turn_order = room.get("turn_order", [])
+        current_index = room.get("current_player_index", 0)
+        was_current_player = (current_index < len(turn_order) and turn_order[current_index] == eliminated_player.id
+                              and room.get("mode") != "speed")
+        if was_current_player:
+            self._stop_turn_timer(game_id)
+        
+        active_players = [p for p in room["players"] if p.is_active]
+        
+        if len(active_players) <= 1:
+            winner = active_players[0] if active_players else None
+            await self._declare_victory(game_id, winner)
+            return
+        
+        # If eliminated player was current player, advance turn
+        if was_current_player:
+            self.advance_turn(game_id)
+            await self._start_turn_timer(game_id)
+        
+        final_players_info = self.get_players_info(game_id)
+        final_current_player = self.get_current_player_info(game_id)
+        
+        # advance_turn sempre escolhe um jogador ativo: sem jogador da vez aqui, a ordem está corrompida
+        if not final_current_player and room["game_state"] == "playing" and room.get("mode") != "speed":
+            logger.error("No current player in %s after eliminating %s (turn_order=%s, index=%s)",
+                         game_id, eliminated_player.id, room.get("turn_order"), room.get("current_player_index"))
+        
+        final_active_count = len(active_players)
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "player_eliminated",
+            "player": eliminated_player.name,
+            "player_id": eliminated_player.id,
+            "players": final_players_info,
+            "active_players": final_active_count,
+            "eliminated_player": eliminated_player.name,
+            "current_player": final_current_player
+        })
+
+    @traced("timer_start")
+    async def _start_turn_timer(self, game_id: str):
+        """Start the timer for the current player's turn."""
+        room = self.rooms.get(game_id)
+        if not room or room["game_state"] != "playing" or room.get("migrating"):
+            return
+            
+        self._stop_turn_timer(game_id)
+        
+        room["turn_start_time"] = self.clock.time()
+        # Usar o tempo configurado da sala
+        turn_time = room["settings"].get("default_time", TURN_TIME_LIMIT)
+        room["remaining_time"] = turn_time
+        
+        logger.debug("🕐 Timer iniciado: %ss para sala %s", turn_time, game_id)
+        self._spawn_ticker(game_id, room)
+        await self._announce_turn(game_id, room)
+    
+    def _spawn_ticker(self, game_id: str, room: dict):
+        turn_token = room["turn_token"] = next(self._turn_tokens)
+        
+        async def ticker():
+            # Só marca o tempo: cada segundo vira um comando na fila da sala
+            try:
+                while True:
+                    await self.clock.sleep(1)
+                    if self.rooms.get(game_id) is not room or room["turn_token"] != turn_token:
+                        break
+                    actor = self.actors.get(game_id)
+                    if actor:
+                        actor.submit(self._timer_tick, game_id, turn_token, internal=True)
+            except asyncio.CancelledError:
+                pass
+        
+        self.timer_tasks[game_id] = create_detached_task(ticker())
+    
+    async def _announce_turn(self, game_id: str, room: dict):
+        """Tell bots and clients that a turn (or speed round) is running."""
+        if room.get("mode") == "speed":
+            # Rodada aberta a todos os jogadores ativos
+            self._publish_event(game_id, "turn_started", {
+                "player_id": None,
+                "expected_letter": self.get_expected_letter(room)
+            })
+        else:
+            current_player = self.get_current_player_info(game_id)
+            if current_player:
+                self._publish_event(game_id, "turn_started", {
+                    "player_id": current_player["id"],
+                    "expected_letter": self.get_expected_letter(room)
+                })
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "timer_started",
+            "remaining_time": room["remaining_time"],
+            "current_player": self.get_current_player_info(game_id)
+        })
+    
+    async def _timer_tick(self, game_id: str, turn_token: int):
+        """One second of a turn (runs in the room actor; ticks of a finished turn are ignored)."""
+        room = self.rooms.get(game_id)
+        if not room or room["game_state"] != "playing" or room["turn_token"] != turn_token:
+            return
+        
+        room["remaining_time"] -= 1
+        await self.broadcast_to_room(game_id, {
+            "type": "timer_update",
+            "remaining_time": room["remaining_time"],
+            "current_player": self.get_current_player_info(game_id)
+        })
+        
+        if room["remaining_time"] <= 0:
+            await self._handle_time_up(game_id)
+    
+    @traced("timer_stop")
+    def _stop_turn_timer(self, game_id: str):
+        """Stop the current timer for a game."""
+        timer_task = self.timer_tasks.pop(game_id, None)
+        if timer_task:
+            # Sem await: um tick já enfileirado é descartado pelo token do turno
+            timer_task.cancel()
+        
+        room = self.rooms.get(game_id)
+        if room:
+            room["turn_token"] = next(self._turn_tokens)
+            room["remaining_time"] = 0
+    
+    async def _apply_time_penalty(self, game_id: str):
+        """Apply time penalty for wrong answer."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+            
+        room["remaining_time"] = max(
+            MIN_TIME_REMAINING, 
+            room.get("remaining_time", 0) - PENALTY_TIME
+        )
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "time_penalty",
+            "remaining_time": room["remaining_time"],
+            "penalty": PENALTY_TIME,
+            "current_player": self.get_current_player_info(game_id)
+        })
+    
+    async def _handle_time_up(self, game_id: str):
+        """Handle when a player's time runs out - eliminate player and advance turn."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+        
+        if room.get("mode") == "speed":
+            self._stop_turn_timer(game_id)
+            # Ninguém acertou a tempo: a rodada fecha sem vencedor e a letra continua a mesma
+            room["round_open"] = False
+            await self.broadcast_to_room(game_id, {
+                "type": "speed_round_result",
+                "winner": None,
+                "winner_id": None,
+                "word": None,
+                "current_word": room["current_word"],
+                "next_letter": self.get_expected_letter(room),
+                "next_letter_index": room.get("next_letter_index", len(room["current_word"]) - 1),
+                "players": self.get_players_info(game_id)
+            })
+            if self._count_turn(room):
+                await self._declare_victory(game_id, None)
+                return
+            self._schedule_speed_round(game_id)
+            return
+        
+        current_player_info = self.get_current_player_info(game_id)
+        if not current_player_info:
+            return
+        
+        self._stop_turn_timer(game_id)
+        
+        if room.get("mode") == "points":
+            # No modo pontos o tempo esgotado só passa a vez (sem pontos)
+            self.advance_turn(game_id)
+            if self._count_turn(room):
+                await self._declare_victory(game_id, None)
+                return
+            await self.broadcast_to_room(game_id, {
+                "type": "next_turn",
+                "reason": "time_up",
+                "skipped_player": current_player_info["name"],
+                "current_player": self.get_current_player_info(game_id),
+                "players": self.get_players_info(game_id)
+            })
+            await self._start_turn_timer(game_id)
+            return
+        
+        current_player = None
+        for player in room["players"]:
+            if player.id == current_player_info["id"]:
+                current_player = player
+                break
+        
+        if current_player:
+            current_player.is_active = False
+            
+            await self.broadcast_to_room(game_id, {
+                "type": "time_up",
+                "eliminated_player": current_player_info["name"],
+                "player_id": current_player_info["id"],
+                "reason": "Tempo esgotado"
+            })
+            
+            await self._handle_player_elimination(game_id, current_player, "time_up")
+    
+    async def _declare_victory(self, game_id: str, winner):
+        """Declare victory and prepare for game reset."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+            
+        self._stop_turn_timer(game_id)
+        
+        if room.get("mode") in ("points", "speed"):
+            winner = self._score_leader(room) or winner
+        
+        room["game_state"] = "victory"
+        room["winner"] = winner.name if winner else "Nenhum vencedor"
+        self._room_changed(game_id)
+        
+        self._publish_event(game_id, "victory", {
+            "winner_id": winner.id if winner else None,
+            "winner": winner.name if winner else None,
+            "turns_taken": room.get("turns_taken", 0)
+        })
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "victory",
+            "winner": winner.name if winner else "Nenhum vencedor",
+            "winner_id": winner.id if winner else None,
+            "players": self.get_players_info(game_id)
+        })
+        
+        async def auto_reset():
+            await self.clock.sleep(5)
+            if game_id in self.rooms and self.rooms[game_id]["game_state"] == "victory":
+                await self.reset_game(game_id)
+                
+        create_detached_task(auto_reset())
+
+    async def _reset_game(self, game_id: str):
+        """Reset the game to waiting state after victory."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+            
+        self._stop_turn_timer(game_id)
+        
+        room["game_state"] = "waiting"
+        room["current_word"] = ""
+        room["used_words"] = set()
+        room["used_grams"] = Counter()
+        room["dictionary"] = None
+        room["turn_order"] = []
+        room["current_player_index"] = 0
+        room["round_number"] = 1
+        room["winner"] = None
+        # Usar configurações da sala para o tempo
+        room["remaining_time"] = room["settings"].get("default_time", TURN_TIME_LIMIT)
+        
+        for player in room["players"]:
+            player.is_active = True
+        
+        self._room_changed(game_id)
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "game_reset",
+            "game_state": "waiting",
+            "players": self.get_players_info(game_id),
+            "message": "Game has been reset. Host can start a new game."
+        })
+
+    async def end_round(self, game_id: str, winner: Player = None):
+        """End the current round."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+        
+        for player in room["players"]:
+            player.is_active = True 
+        
+        room["round_number"] += 1
+        room["game_state"] = "waiting"
+        room["dictionary"] = None
+        self._room_changed(game_id)
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "round_ended",
+            "winner": winner.name if winner else None,
+            "round_number": room["round_number"],
+            "players": self.get_players_info(game_id)
+        })
+
+    async def broadcast_to_room(self, game_id: str, message: dict):
+        """Broadcast a message to all players in a room."""
+        if game_id not in self.rooms:
+            return
+        
+        await self.transport.emit(message, room=game_id)
+
+    def get_players_info(self, game_id: str) -> list:
+        """Get detailed information about all players in a room."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return []
+        
+        return [{
+            "id": player.id,
+            "name": player.name,
+            "is_active": player.is_active,
+            "is_host": player.is_host,
+            "is_bot": player.is_bot,
+            "score": player.score
+        } for player in room["players"]]
+
+    def get_current_player_info(self, game_id: str) -> dict:
+        """Get information about the current player's turn."""
+        room = self.rooms.get(game_id)
+        if not room or room["game_state"] != "playing":
+            logger.debug("❌ No room or game not playing for %s", game_id)
+            return None
+        
+        if room.get("mode") == "speed":
+            # No modo speed todos jogam ao mesmo tempo: não há jogador da vez
+            return None
+        
+        turn_order = room.get("turn_order", [])
+        if not turn_order:
+            logger.debug("❌ No turn order for %s", game_id)
+            return None
+            
+        current_index = room.get("current_player_index", 0)
+        if current_index >= len(turn_order):
+            logger.debug("❌ Index %s out of bounds for turn_order length %s", current_index, len(turn_order))
+            return None
+            
+        # Caminho quente (várias vezes por turno): sem log quando encontra o jogador
+        current_player_id = turn_order[current_index]
+        for player in room["players"]:
+            if player.id == current_player_id and player.is_active:
+                return {
+                    "id": player.id,
+                    "name": player.name
+                }
+        
+        logger.debug("❌ Player %s not found or inactive", current_player_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("   Active players: %s", [p.name for p in room['players'] if p.is_active])
+        return None
+
+    def is_player_host(self, game_id: str, sid: str) -> bool:
+        """Check if a player is the host of the room."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return False
+        
+        for player in room["players"]:
+            if player.websocket == sid:
+                return player.is_host
+        return False
+
+    def get_player_by_sid(self, game_id: str, sid: str) -> Player:
+        """Find a player by their socket ID."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return None
+        
+        for player in room["players"]:
+            if player.websocket == sid:
+                return player
+        return None
+
+    @traced("advance_turn")
+    def advance_turn(self, game_id: str):
+        """Advance to the next player's turn."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+        
+        active_players = [p for p in room["players"] if p.is_active]
+        
+        if len(active_players) <= 1:
+            room["turn_order"] = [p.id for p in active_players] if active_players else []
+            room["current_player_index"] = 0
+            logger.debug("⚠️ Not enough active players for turn advancement: %s", len(active_players))
+            return
+        
+        old_turn_order = room.get("turn_order", [])
+        old_index = room.get("current_player_index", 0)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔄 Advance turn - Active players: %s", [p.name for p in active_players])
+            logger.debug("   Old turn order: %s, old index: %s", old_turn_order, old_index)
+        
+        room["turn_order"] = [p.id for p in active_players]
+        
+        if old_turn_order and old_index < len(old_turn_order):
+            current_player_id = old_turn_order[old_index]
+            logger.debug("   Looking for old current player: %s", current_player_id)
+            
+            try:
+                new_index = room["turn_order"].index(current_player_id)
+                room["current_player_index"] = (new_index + 1) % len(room["turn_order"])
+                logger.debug("   Found at %s, advancing to %s", new_index, room['current_player_index'])
+            except ValueError:
+                room["current_player_index"] = 0
+                logger.debug("   Old player not found, resetting to 0")
+        else:
+            room["current_player_index"] = 0
+            logger.debug("   No valid old state, starting at 0")
+        
+        logger.debug("   New turn order: %s, new index: %s", room['turn_order'], room['current_player_index'])
+
+    def _count_turn(self, room: dict) -> bool:
+        """Count a finished turn (points and speed modes). Returns True when the round limit was reached."""
+        room["turns_taken"] += 1
+        limit = room["settings"].get("round_limit", ROUND_LIMIT)
+        if room.get("mode") == "speed":
+            # No modo speed cada rodada já é disputada por todos
+            return room["turns_taken"] >= limit
+        active = sum(1 for p in room["players"] if p.is_active)
+        return room["turns_taken"] >= limit * max(active, 1)
+
+    def _score_leader(self, room: dict) -> Optional[Player]:
+        """Player with the highest score (ties go to whoever joined the room first)."""
+        return max(room["players"], key=lambda p: p.score, default=None)
+
+    def get_room_dictionary(self, room: dict) -> AnyDictionary:
+        """
+        Dictionary version pinned by the running game, or the current one for the room settings.
+        Outside a game the list may still have to be loaded (blocking): on the event loop use
+        acquire_room_dictionary instead.
+        """
+        return room.get("dictionary") or registry.get(room.get("language", DEFAULT_LANGUAGE), room["difficulty"])
+
+    async def acquire_room_dictionary(self, room: dict) -> AnyDictionary:
+        """Like get_room_dictionary, but loads a missing list in a worker thread."""
+        return room.get("dictionary") or await registry.acquire(room.get("language", DEFAULT_LANGUAGE), room["difficulty"])
+
+    def validate_word(self, room: dict, word: str) -> Optional[str]:
+        """Check a word against the room rules. Returns a reject code, or None if the word is valid."""
+        word = word.lower()
+        
+        if not verify_word(word, room["difficulty"], self.get_room_dictionary(room)):
+            return "not_in_dictionary"
+        return self._check_rules(room, word)
+
+    def _check_rules(self, room: dict, word: str) -> Optional[str]:
+        """Rules for a word already resolved to its dictionary form (lowercase)."""
+        if word in room["used_words"]:
+            return "already_used"
+        
+        return self._check_letter(room, word)
+
+    def _check_letter(self, room: dict, word: str) -> Optional[str]:
+        """Letter/fragment rule alone: it does not need the dictionary, so it also works on the raw input."""
+        if not word:
+            return "not_in_dictionary"
+        expected_letter = self.get_expected_letter(room).lower()
+        if room["difficulty"] == "fragment":
+            if expected_letter not in strip_accents(word):
+                return "missing_fragment"
+        elif strip_accents(word[0]) != strip_accents(expected_letter):
+            return "wrong_letter"
+        return None
+
+    def get_expected_letter(self, room: dict) -> str:
+        """Get the expected starting letter for the next word."""
+        if not room["current_word"]:
+            return ""
+        
+        current_word = room["current_word"]
+        difficulty = room["difficulty"]
+        
+        if difficulty.lower() in ("caotic", "fragment"):
+            # In chaotic and fragment modes, use the stored next_letter if it exists
+            # This ensures the letter stays the same until someone gets it right
+            return room.get("next_letter", current_word[-1])
+        else:
+            return current_word[-1]
+    
+    def get_next_letter_info(self, room: dict, word: str) -> dict:
+        """Get information about the next letter based on game difficulty."""
+        difficulty = room["difficulty"]
+        
+        if difficulty.lower() == "fragment":
+            # In fragment mode, sample a 2-3 letter fragment of the accepted word
+            # that still has enough unused words in the dictionary
+            room.setdefault("used_grams", Counter()).update(word_grams(word))
+            fragment, index = self.get_room_dictionary(room).ngram_index.choose_fragment(word, room["used_grams"])
+            if not fragment:
+                fragment, index = "a", -1
+            
+            room["next_letter"] = fragment
+            room["next_letter_index"] = index
+            
+            return {"letter": fragment, "index": index}
+        elif difficulty.lower() == "caotic":
+            # In chaotic mode, randomly select a letter from the accepted word
+            # This only happens when a word is successfully accepted
+            word_lower = word.lower()
+            valid_letters = "abcdefghijklmnopqrstuvwxyz"
+            
+            valid_positions = [
+                i for i, char in enumerate(word_lower) 
+                if char in valid_letters
+            ]
+            
+            if not valid_positions:
+                return {"letter": "a", "index": -1}
+            
+            chosen_index = random.choice(valid_positions)
+            chosen_letter = word_lower[chosen_index]
+            
+            # Store the new letter for future attempts
+            room["next_letter"] = chosen_letter
+            room["next_letter_index"] = chosen_index
+            
+            return {"letter": chosen_letter, "index": chosen_index}
+        else:
+            # Normal and easy modes: always use the last letter
+            last_index = len(word) - 1
+            last_letter = word[-1].lower()
+            
+            return {"letter": last_letter, "index": last_index}
+
+    async def _start_new_game(self, game_id: str, requesting_player_sid: str = None):
+        """Start a new game with a random word."""
+        room = self.rooms.get(game_id)
+        if not room or len(room["players"]) < 2:
+            return False, "Minimum 2 players required"
+        
+        if requesting_player_sid and not self.is_player_host(game_id, requesting_player_sid):
+            return False, "Only the room creator can start the game"
+        
+        if room["game_state"] == "playing":
+            return False, "Game already in progress"
+        
+        if room.get("migrating"):
+            return False, "Room is moving to another server"
+        
+        for player in room["players"]:
+            player.is_active = True
+            player.score = 0
+        
+        import random
+        active_players = [p for p in room["players"] if p.is_active]
+        random.shuffle(active_players)
+        room["turn_order"] = [p.id for p in active_players]
+        room["current_player_index"] = 0
+        room["mode"] = room["settings"].get("mode", "elimination")
+        room["turns_taken"] = 0
+        
+        await self._pin_dictionary(room)
+        room["round_open"] = room["mode"] == "speed"
+        initial_word = get_random_word(room["difficulty"], room["dictionary"])
+        room["current_word"] = initial_word
+        room["game_state"] = "playing"
+        self._room_changed(game_id)
+        
+        room["used_words"] = {initial_word.lower()}
+        room["used_grams"] = Counter()
+        
+        next_letter_info = self.get_next_letter_info(room, initial_word)
+        
+        self._publish_event(game_id, "game_started", {
+            "initial_word": initial_word,
+            "difficulty": room["difficulty"],
+            "language": room["language"],
+            "mode": room["mode"],
+            "round_limit": room["settings"].get("round_limit", ROUND_LIMIT),
+            # Versão fixada para a partida: o replay só confere o dicionário contra esta mesma lista
+            "dictionary_hash": room["dictionary"].content_hash,
+            "next_letter": next_letter_info["letter"],
+            "turn_order": [{"id": p.id, "name": p.name, "bot": p.is_bot} for p in active_players]
+        })
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "game_started",
+            "initial_word": initial_word,
+            "current_word": initial_word,
+            "next_letter": next_letter_info["letter"],
+            "next_letter_index": next_letter_info["index"],
+            "round_number": room["round_number"],
+            "difficulty": room["difficulty"],
+            "mode": room["mode"],
+            "current_player": self.get_current_player_info(game_id),
+            "players": self.get_players_info(game_id),
+            "turn_order": [{"id": p_id, "name": next((p.name for p in room["players"] if p.id == p_id), "Unknown")} for p_id in room["turn_order"]],
+            "room_settings": room["settings"]  # Enviar configurações da sala
+        })
+        
+        await self._start_turn_timer(game_id)
+        
+        return True, "Game started successfully"
+
+    async def _pin_dictionary(self, room: dict):
+        """Pin the current dictionary version for the game and warm the indexes it needs."""
+        room["dictionary"] = await registry.acquire(room["language"], room["difficulty"])
+        if room["mode"] in ("points", "speed"):
+            # Tabela de pontuação calculada uma vez por versão do dicionário, fora do event loop
+            await asyncio.to_thread(lambda: room["dictionary"].score_table)
+        if room["difficulty"] == "fragment":
+            # O índice de fragmentos é construído fora do event loop na primeira partida
+            await asyncio.to_thread(lambda: room["dictionary"].ngram_index)
+
+    async def _handle_word_submission(self, game_id: str, sid: str, word: str):
+        """Process a word submission from a player."""
+        room = self.rooms.get(game_id)
+        if not room:
+            await self.transport.emit({
+                "type": "error",
+                "message": "Room not found"
+            }, to=sid)
+            return
+        
+        if room["game_state"] != "playing":
+            await self.transport.emit({
+                "type": "error", 
+                "message": "Game is not in progress"
+            }, to=sid)
+            return
+        
+        if room.get("migrating") or "migration" in room:
+            await self.transport.emit({
+                "type": "error",
+                "message": "Room is moving to another server, try again in a moment"
+            }, to=sid)
+            return
+        
+        player = self.get_player_by_sid(game_id, sid)
+        if not player:
+            await self.transport.emit({
+                "type": "error",
+                "message": "Player not found"
+            }, to=sid)
+            return
+        
+        if room.get("mode") == "speed":
+            await self._handle_speed_submission(game_id, room, player, word)
+            return
+        
+        current_player_info = self.get_current_player_info(game_id)
+        if not current_player_info or current_player_info["id"] != player.id:
+            await self.transport.emit({
+                "type": "error",
+                "message": "Not your turn to play"
+            }, to=sid)
+            return
+        
+        # Buscar o nome do jogador para incluir na mensagem
+        player_name = "Alguém"
+        for player in room["players"]:
+            if player.websocket == sid:
+                player_name = player.name
+                break
+
+        response_time = self.clock.time() - room["turn_start_time"] if room.get("turn_start_time") else None
+        
+        # Usa a forma do dicionário, com acentos (ex.: "cafe" -> "café"). Mesmo quando a consulta
+        # sai do event loop (SQLite), nenhum outro comando da sala roda até este terminar
+        with tracer.span("verify_word"):
+            resolved = await self.get_room_dictionary(room).resolve_async(word)
+            word = resolved or word.strip()
+            reject_code = self._check_rules(room, word) if resolved else "not_in_dictionary"
+        if reject_code:
+            expected_letter = self.get_expected_letter(room).lower()
+            self._publish_event(game_id, "word_submitted", {
+                "player_id": player.id,
+                "player": player_name,
+                "word": word.lower(),
+                "accepted": False,
+                "reason": reject_code,
+                "response_time": response_time
+            })
+            # Sugestões só saem junto com a rejeição se o bucket da letra já existe; senão ele é
+            # construído numa thread e as sugestões chegam depois, em word_suggestions
+            suggestions = []
+            pending_suggestions = False
+            if reject_code == "not_in_dictionary" and word:
+                index = self.get_room_dictionary(room).suggestions
+                if index.is_settled(word[0].lower()):
+                    suggestions = index.suggest(word.lower(), exclude=room["used_words"])
+                else:
+                    pending_suggestions = True
+            await self.broadcast_to_room(game_id, {
+                "type": "word_rejected",
+                "reason": REJECT_REASONS[reject_code].format(letter=expected_letter.upper()),
+                "word": word,
+                "player": player_name,
+                "suggestions": suggestions
+            })
+            if pending_suggestions:
+                create_detached_task(self._send_suggestions(game_id, room, self.get_room_dictionary(room), word, player_name))
+            await self._apply_time_penalty(game_id)
+            return
+        
+        room["current_word"] = word.lower()
+        room["used_words"].add(word.lower())
+        next_letter_info = self.get_next_letter_info(room, word.lower())
+        
+        points = 0
+        if room["mode"] == "points":
+            base = self.get_room_dictionary(room).score_table.score(word.lower())
+            points = base + speed_bonus(base, response_time, room["settings"].get("default_time", TURN_TIME_LIMIT))
+            player.score += points
+        
+        self._publish_event(game_id, "word_submitted", {
+            "player_id": player.id,
+            "player": player.name,
+            "word": word.lower(),
+            "accepted": True,
+            "reason": None,
+            "response_time": response_time,
+            "next_letter": next_letter_info["letter"],
+            "score": points
+        })
+        
+        # O timer do próximo turno (_start_turn_timer) substitui o atual
+        self.advance_turn(game_id)
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "word_submitted",
+            "player": player.name,
+            "word": word.lower(),
+            "current_word": word.lower(),
+            "next_letter": next_letter_info["letter"],
+            "next_letter_index": next_letter_info["index"],
+            "score": points,
+            "current_player": self.get_current_player_info(game_id),
+            "players": self.get_players_info(game_id)
+        })
+        
+        if room["mode"] == "points" and self._count_turn(room):
+            await self._declare_victory(game_id, None)
+            return
+        
+        await self._start_turn_timer(game_id)
+
+    async def _handle_speed_submission(self, game_id: str, room: dict, player: Player, word: str):
+        """
+        Speed round: every active player races for the shared letter and the first
+        valid word (in arrival order) wins. Cheap checks run before the dictionary,
+        and rejections only go back to the sender instead of the whole room.
+        """
+        sid = player.websocket
+        if not room.get("round_open"):
+            await self._reject_speed_submission(game_id, player, word, "round_closed")
+            return
+        if not player.is_active:
+            await self.transport.emit({"type": "error", "message": "Player is not active"}, to=sid)
+            return
+        
+        reject_code = self._check_letter(room, word.lower().strip())
+        if reject_code:
+            await self._reject_speed_submission(game_id, player, word, reject_code)
+            return
+        
+        # Os envios chegam em ordem pela fila da sala: a primeira palavra válida leva a rodada
+        with tracer.span("verify_word"):
+            resolved = await self.get_room_dictionary(room).resolve_async(word)
+            word = resolved or word.strip()
+            reject_code = self._check_rules(room, word) if resolved else "not_in_dictionary"
+        if reject_code:
+            await self._reject_speed_submission(game_id, player, word, reject_code)
+            return
+        
+        room["round_open"] = False
+        word = word.lower()
+        response_time = self.clock.time() - room["turn_start_time"]
+        room["current_word"] = word
+        room["used_words"].add(word)
+        next_letter_info = self.get_next_letter_info(room, word)
+        base = self.get_room_dictionary(room).score_table.score(word)
+        points = base + speed_bonus(base, response_time, room["settings"].get("default_time", TURN_TIME_LIMIT))
+        player.score += points
+        
+        self._publish_event(game_id, "word_submitted", {
+            "player_id": player.id,
+            "player": player.name,
+            "word": word,
+            "accepted": True,
+            "reason": None,
+            "response_time": response_time,
+            "next_letter": next_letter_info["letter"],
+            "score": points
+        })
+        
+        self._stop_turn_timer(game_id)
+        await self.broadcast_to_room(game_id, {
+            "type": "speed_round_result",
+            "winner": player.name,
+            "winner_id": player.id,
+            "word": word,
+            "score": points,
+            "current_word": word,
+            "next_letter": next_letter_info["letter"],
+            "next_letter_index": next_letter_info["index"],
+            "players": self.get_players_info(game_id)
+        })
+        
+        if self._count_turn(room):
+            await self._declare_victory(game_id, None)
+            return
+        self._schedule_speed_round(game_id)
+
+    async def _reject_speed_submission(self, game_id: str, player: Player, word: str, reject_code: str):
+        """Answer a losing or invalid speed-round submission to its sender only."""
+        room = self.rooms[game_id]
+        if reject_code != "round_closed":
+            self._publish_event(game_id, "word_submitted", {
+                "player_id": player.id,
+                "player": player.name,
+                "word": word.lower(),
+                "accepted": False,
+                "reason": reject_code,
+                "response_time": self.clock.time() - room["turn_start_time"] if room.get("turn_start_time") else None
+            })
+        await self.transport.emit({
+            "type": "word_rejected",
+            "reason": REJECT_REASONS[reject_code].format(letter=self.get_expected_letter(room).upper()),
+            "word": word,
+            "player": player.name,
+            "suggestions": []
+        }, to=player.websocket)
+
+    async def _send_suggestions(self, game_id: str, room: dict, dictionary: AnyDictionary, word: str, player_name: str):
+        """Suggestions for a rejection whose letter had no bucket yet, sent once it is built."""
+        suggestions = await get_suggestions(
+            word, dictionary.suggestions, lambda letter: registry.build_suggestions(dictionary, letter),
+            exclude=room["used_words"]
+        )
+        if suggestions and self.rooms.get(game_id) is room:
+            await self.broadcast_to_room(game_id, {
+                "type": "word_suggestions",
+                "word": word,
+                "player": player_name,
+                "suggestions": suggestions
+            })
+
+    def _schedule_speed_round(self, game_id: str):
+        """Open the next speed round after a short pause."""
+        room = self.rooms[game_id]
+        round_number = room["turns_taken"]
+        
+        async def open_round():
+            current = self.rooms.get(game_id)
+            if (current is not room or room["game_state"] != "playing" or room["turns_taken"] != round_number
+                    or room.get("migrating")):
+                return
+            room["round_open"] = True
+            await self._start_turn_timer(game_id)
+        
+        async def next_round():
+            await self.clock.sleep(SPEED_ROUND_PAUSE)
+            actor = self.actors.get(game_id)
+            if actor:
+                actor.submit(open_round, internal=True)
+        
+        create_detached_task(next_round())
+
+    async def _export_room(self, game_id: str) -> Optional[dict]:
+        room = self.rooms.get(game_id)
+        if not room or room.get("migrating"):
+            return None
+        
+        timer_running = game_id in self.timer_tasks
+        remaining_time = room["remaining_time"]
+        self._stop_turn_timer(game_id)
+        # Congelada: o tempo restante do turno fica como estava no snapshot
+        room["remaining_time"] = remaining_time
+        # Segredo de cada jogador humano: só ele o recebe, no seu migrate, para reclamar o lugar no peer
+        rejoin_secrets = {p.id: secrets.token_urlsafe(16) for p in room["players"] if not p.is_bot}
+        room["migrating"] = {"timer_running": timer_running, "rejoin_secrets": rejoin_secrets}
+        return snapshot_room(game_id, room, timer_running, rejoin_secrets)
+
+    async def _complete_export(self, game_id: str, url: str):
+        room = self.rooms.get(game_id)
+        if not room:
+            return
+        rejoin_secrets = room["migrating"]["rejoin_secrets"]
+        for player in room["players"]:
+            if player.id in rejoin_secrets:
+                await self.transport.emit({
+                    "type": "migrate", "url": url, "game_id": game_id, "rejoin": True,
+                    "rejoin_secret": rejoin_secrets[player.id]
+                }, to=player.websocket)
+        del self.rooms[game_id]
+        self._room_changed(game_id)
+
+    async def _abort_export(self, game_id: str):
+        room = self.rooms.get(game_id)
+        migrating = room.pop("migrating", None) if room else None
+        if migrating:
+            await self._resume_room(game_id, migrating["timer_running"])
+
+    async def _import_room(self, snapshot: dict) -> bool:
+        game_id = snapshot["game_id"]
+        if game_id in self.rooms:
+            logger.warning(f"🚚 Room {game_id} already exists here, refusing migrated copy")
+            return False
+        
+        self._ensure_room(game_id)
+        room = self.rooms[game_id]
+        room.update(restore_fields(snapshot))
+        room["players"] = restore_players(snapshot)
+        room["used_words"], room["used_grams"] = restore_used(snapshot)
+        if room["game_state"] == "playing":
+            await self._pin_dictionary(room)
+        elif room["game_state"] == "victory":
+            await self._reset_game(game_id)
+        
+        humans = {p.id: snapshot["rejoin_secrets"][p.id] for p in room["players"] if not p.is_bot}
+        room["awaiting_rejoin"] = humans
+        room["migration"] = {"taken_at": snapshot["taken_at"], "timer_running": snapshot["timer_running"]}
+        self._room_changed(game_id)
+        self._publish_event(game_id, "room_restored", {
+            "bot_ids": [p.id for p in room["players"] if p.is_bot]
+        })
+        
+        if not humans:
+            await self._resume_migrated_room(game_id)
+            return True
+        
+        async def grace():
+            await self.clock.sleep(MIGRATION_GRACE)
+            actor = self.actors.get(game_id)
+            if actor:
+                actor.submit(self._resume_migrated_room, game_id, internal=True)
+        
+        create_detached_task(grace())
+        return True
+
+    async def _rejoin(self, game_id: str, sid: str, player_id: str, secret: str) -> bool:
+        room = self.rooms.get(game_id)
+        awaiting = room.get("awaiting_rejoin") if room else None
+        expected = awaiting.get(player_id) if awaiting and isinstance(player_id, str) else None
+        # Só vale para salas recém-migradas, uma vez por jogador, com o segredo enviado só a ele
+        if not expected or not isinstance(secret, str) or not hmac.compare_digest(secret, expected):
+            # Entrou depois do snapshot, demorou demais ou não é o dono do lugar: entra como jogador novo
+            await self.transport.emit({"type": "rejoin_failed", "game_id": game_id}, to=sid)
+            return False
+        
+        del awaiting[player_id]
+        player = next(p for p in room["players"] if p.id == player_id)
+        
+        player.websocket = sid
+        await self.transport.join(sid, game_id, {
+            "game_id": game_id,
+            "player_name": player.name,
+            "player_id": player.id
+        })
+        await self.transport.emit({
+            "type": "room_state",
+            "player_id": player.id,
+            "game_state": room["game_state"],
+            "current_word": room["current_word"],
+            "next_letter": self.get_expected_letter(room) if room["game_state"] == "playing" else "",
+            "next_letter_index": room.get("next_letter_index", 0),
+            "difficulty": room["difficulty"],
+            "mode": room["mode"],
+            "remaining_time": room["remaining_time"],
+            "current_player": self.get_current_player_info(game_id),
+            "players": self.get_players_info(game_id),
+            "room_settings": room["settings"]
+        }, to=sid)
+        
+        if not awaiting:
+            await self._resume_migrated_room(game_id)
+        return True
+
+    async def _resume_migrated_room(self, game_id: str):
+        room = self.rooms.get(game_id)
+        if not room or "migration" not in room:
+            return
+        
+        migration = room.pop("migration")
+        missing = room.pop("awaiting_rejoin", {})
+        paused = time.time() - migration["taken_at"]
+        logger.info(f"🚚 Room {game_id} resumed after migration: paused {paused * 1000:.0f}ms"
+                    + (f", {len(missing)} player(s) did not reconnect" if missing else ""))
+        self._publish_event(game_id, "room_migrated", {"paused": paused, "missing_players": len(missing)})
+        await self.broadcast_to_room(game_id, {"type": "room_resumed", "paused": round(paused, 3)})
+        await self._resume_room(game_id, migration["timer_running"])
+
+    async def _resume_room(self, game_id: str, timer_running: bool):
+        """Restart the clock of an unfrozen room, keeping the remaining time of the interrupted turn."""
+        room = self.rooms[game_id]
+        if room["game_state"] != "playing":
+            return
+        if not timer_running:
+            if room.get("mode") == "speed":
+                self._schedule_speed_round(game_id)
+            else:
+                await self._start_turn_timer(game_id)
+            return
+        
+        turn_time = room["settings"].get("default_time", TURN_TIME_LIMIT)
+        # O tempo de resposta continua contando do início real do turno, sem a pausa
+        room["turn_start_time"] = self.clock.time() - max(0, turn_time - room["remaining_time"])
+        self._spawn_ticker(game_id, room)
+        await self._announce_turn(game_id, room)
+
+    async def _change_room_difficulty(self, game_id: str, difficulty: str, requesting_player_sid: str):
+        """Change room difficulty - only when game is not in progress."""
+        if difficulty.lower() not in DIFFICULTIES:
+            difficulty = "normal"
+        
+        room = self.rooms.get(game_id)
+        if not room:
+            return False, "Room not found"
+        
+        if room["game_state"] == "playing":
+            await self.transport.emit({
+                "type": "difficulty_change_denied",
+                "reason": "Cannot change difficulty during game"
+            }, to=requesting_player_sid)
+            return False, "Game in progress"
+        
+        if not self.is_player_host(game_id, requesting_player_sid):
+            await self.transport.emit({
+                "type": "difficulty_change_denied", 
+                "reason": "Only the room creator can change difficulty"
+            }, to=requesting_player_sid)
+            return False, "Only host can change"
+        
+        player_in_room = any(player.websocket == requesting_player_sid for player in room["players"])
+        if not player_in_room:
+            await self.transport.emit({
+                "type": "difficulty_change_denied", 
+                "reason": "You are not in this room"
+            }, to=requesting_player_sid)
+            return False, "Player not in room"
+        
+        room["difficulty"] = difficulty.lower()
+        self._room_changed(game_id)
+        
+        await self.broadcast_to_room(game_id, {
+            "type": "difficulty_changed",
+            "difficulty": room["difficulty"],
+            "message": f"Difficulty changed to: {room['difficulty']}"
+        })
+        return True, "Difficulty changed successfully"
+
+    async def _update_room_settings(self, game_id: str, settings: dict, requesting_player_sid: str):
+        """Update room settings (time and difficulty) - can be changed at any time by host."""
+        room = self.rooms.get(game_id)
+        if not room:
+            return False, "Room not found"
+
+        if not self.is_player_host(game_id, requesting_player_sid):
+            await self.transport.emit({
+                "type": "settings_update_denied", 
+                "reason": "Only the room creator can change settings"
+            }, to=requesting_player_sid)
+            return False, "Only host can change"
+
+        player_in_room = any(player.websocket == requesting_player_sid for player in room["players"])
+        if not player_in_room:
+            await self.transport.emit({
+                "type": "settings_update_denied", 
+                "reason": "You are not in this room"
+            }, to=requesting_player_sid)
+            return False, "Player not in room"
+
+        if "round_limit" in settings:
+            try:
+                round_limit = min(MAX_ROUND_LIMIT, max(1, int(settings["round_limit"])))
+            except (TypeError, ValueError):
+                return False, f"Round limit must be a number between 1 and {MAX_ROUND_LIMIT}"
+
+        # Atualizar configurações
+        if "default_time" in settings:
+            new_time = settings["default_time"]
+            old_time = room["settings"].get("default_time", "unknown")
+            room["settings"]["default_time"] = new_time
+            room["remaining_time"] = new_time
+            
+            # Se há um timer ativo, atualizá-lo também
+            if room["game_state"] == "playing" and self.timer_tasks.get(game_id):
+                room["remaining_time"] = new_time
+                logger.debug("Active timer updated to: %s", new_time)
+                await self.broadcast_to_room(game_id, {
+                    "type": "timer_update",
+                    "remaining_time": room["remaining_time"],
+                    "current_player": self.get_current_player_info(game_id)
+                })
+
+        if "difficulty" in settings:
+            difficulty = settings["difficulty"].lower()
+            # Mapear dificuldades do frontend para backend
+            difficulty_map = {
+                "fácil": "easy",
+                "normal": "normal", 
+                "difícil": "caotic",
+                "fragmento": "fragment"
+            }
+            backend_difficulty = difficulty_map.get(difficulty, "normal")
+            
+            room["settings"]["difficulty"] = difficulty
+            room["difficulty"] = backend_difficulty
+            self._room_changed(game_id)
+            if backend_difficulty == "fragment":
+                dictionary = await self.acquire_room_dictionary(room)
+                await asyncio.to_thread(lambda: dictionary.ngram_index)
+
+        if settings.get("mode") in GAME_MODES:
+            # Modo e limite de rodadas valem a partir da próxima partida
+            room["settings"]["mode"] = settings["mode"]
+            room["settings"]["max_players"] = SPEED_MAX_PLAYERS if settings["mode"] == "speed" else MAX_PLAYERS
+            self._room_changed(game_id)
+        
+        if "round_limit" in settings:
+            room["settings"]["round_limit"] = round_limit
+
+        if "language" in settings and settings["language"] in registry.languages():
+            # Vale a partir da próxima partida; a atual continua com o dicionário fixado
+            room["settings"]["language"] = settings["language"]
+            room["language"] = settings["language"]
+
+        await self.broadcast_to_room(game_id, {
+            "type": "room_settings_updated",
+            "settings": room["settings"],
+            "message": "Room settings updated successfully"
+        })
+        return True, "Settings updated successfully"
@@ -7,6 +7,8 @@ class Player:
         self.websocket = websocket  # Armazena o SID do Socket.IO
         self.is_active = True  # Se o player está ativo na rodada atual
         self.is_host = is_host  # Se o player é o criador/host da sala
+        self.is_bot = False  # Se o player é controlado pelo servidor
+        self.score = 0  # Pontos na partida atual (modo pontos)
     
     def __str__(self):
         return f"Player({self.name}, id: {self.id[:8]}, active: {self.is_active}, host: {self.is_host})"
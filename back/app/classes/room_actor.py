@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from app.utils.tracing import create_detached_task, current_span, tracer
+
+logger = logging.getLogger(__name__)
+
+# Comandos de jogadores aceitos na fila de uma sala antes de recusar novos (cabe uma rajada do modo speed)
+COMMAND_QUEUE_SIZE = 512
+# Limites (segundos) do histograma de espera na fila
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class RoomBusy(Exception):
+    """The command queue of a room is full."""
+
+
+class QueueMetrics:
+    """
+    Command queue counters summed over every room, kept apart from the actors so
+    they survive a room closing: the wait histogram is cumulative, per Prometheus.
+    """
+
+    def __init__(self, buckets: tuple = WAIT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.processed = 0
+        self.rejected = 0
+
+    def observe_wait(self, seconds: float):
+        self.wait_count += 1
+        self.wait_sum += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+
+class RoomActor:
+    """
+    Runs the commands of one room one at a time, in arrival order.
+
+    Every change to a room goes through its actor, so a command never sees the
+    room half-changed by another one (a submission and a timer tick can no longer
+    interleave at an await). Each room has its own actor, so rooms still run
+    concurrently.
+
+    When the room is idle the caller runs its command itself (no task, no future);
+    commands arriving meanwhile are queued and drained by a worker task that only
+    exists while the queue is not empty.
+    """
+
+    def __init__(self, game_id: str, max_queue: int = COMMAND_QUEUE_SIZE,
+                 on_idle: Callable[["RoomActor"], None] = None, metrics: Optional[QueueMetrics] = None):
+        self.game_id = game_id
+        self.max_queue = max_queue
+        self.on_idle = on_idle
+        self.metrics = metrics or QueueMetrics()
+        self._commands: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        # Tarefa que está executando um comando agora (o worker ou quem chamou com a sala livre)
+        self._owner: Optional[asyncio.Task] = None
+        # Métricas da fila
+        self.max_depth = 0
+        self.processed = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._commands)
+
+    def submit(self, command, *args, internal: bool = False) -> Optional[asyncio.Future]:
+        """
+        Queue a command and return a future with its result. Player commands are refused
+        (RoomBusy) when the queue is full; internal ones (timer ticks) always get in and
+        return no future.
+        """
+        if not internal and len(self._commands) >= self.max_queue:
+            self.rejected += 1
+            self.metrics.rejected += 1
+            raise RoomBusy(self.game_id)
+        future = None if internal else asyncio.get_running_loop().create_future()
+        self._commands.append((command, args, future, current_span(), time.perf_counter()))
+        if len(self._commands) > self.max_depth:
+            self.max_depth = len(self._commands)
+        if self._owner is None and self._task is None:
+            self._task = create_detached_task(self._run())
+        return future
+
+    async def call(self, command, *args):
+        """Run a command through the queue and wait for its result."""
+        current = asyncio.current_task()
+        if current is self._owner:
+            # Já dentro de um comando desta sala: esperar a fila seria um deadlock
+            return await command(*args)
+        if self._owner is not None or self._commands:
+            return await self.submit(command, *args)
+
+        # Sala livre: roda direto na tarefa de quem chamou
+        self._owner = current
+        try:
+            return await command(*args)
+        finally:
+            self.processed += 1
+            self.metrics.processed += 1
+            self.metrics.observe_wait(0.0)
+            self._owner = None
+            self._drain_or_idle()
+
+    def _drain_or_idle(self):
+        if self._commands:
+            if self._task is None:
+                self._task = create_detached_task(self._run())
+        elif self.on_idle:
+            self.on_idle(self)
+
+    async def _run(self):
+        self._owner = self._task
+        while self._commands:
+            command, args, future, span, queued_at = self._commands.popleft()
+            waited = time.perf_counter() - queued_at
+            self.wait_time += waited
+            self.metrics.observe_wait(waited)
+            try:
+                # Continua o trace de quem enviou o comando
+                with tracer.activate(span):
+                    result = await command(*args)
+            except Exception as e:
+                if future is None or future.done():
+                    logger.exception(f"Room {self.game_id}: command {command.__name__} failed")
+                else:
+                    future.set_exception(e)
+            else:
+                if future is not None and not future.done():
+                    future.set_result(result)
+            self.processed += 1
+            self.metrics.processed += 1
+        self._owner = None
+        self._task = None
+        self._drain_or_idle()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "wait_time": self.wait_time
+        }
@@ -0,0 +1,145 @@
+# Compares the in-memory and SQLite dictionary backends: load time, RSS and lookup latency.
+# Each backend runs in its own process so the RSS numbers do not mix.
+# Uso: python -m app.tools.bench_dictionary [--difficulty normal] [--samples 20000] [--cache-size 50000]
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.dictionary import DictionaryRegistry, get_dict_file, load_dictionary
+from app.utils.sqlite_dictionary import open_sqlite_dictionary
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def per_call_ns(func, words: list[str]) -> float:
+    started = time.perf_counter()
+    for word in words:
+        func(word)
+    return (time.perf_counter() - started) / len(words) * 1e9
+
+
+async def async_latencies(dictionary, words: list[str]) -> list[float]:
+    latencies = []
+    for word in words:
+        started = time.perf_counter()
+        await dictionary.resolve_async(word)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run_backend(args):
+    """Child process: load one backend and measure it."""
+    with open(args.sample_file, encoding="utf-8") as f:
+        samples = json.load(f)
+
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    registry = DictionaryRegistry(1 << 40, backend=args.backend)
+    dictionary = registry.get(difficulty=args.difficulty)
+    if args.backend == "sqlite":
+        dictionary.cache_size = args.cache_size
+    load_ms = (time.perf_counter() - started) * 1000
+    rss_loaded = rss_mb()
+
+    hits, misses = samples["hits"], samples["misses"]
+    # Metade das palavras é "quente" (repetida), como acontece com as palavras comuns numa partida
+    hot = hits[:len(hits) // 2]
+    result = {
+        "backend": args.backend,
+        "words": len(dictionary.words),
+        "load_ms": load_ms,
+        "rss_loaded_mb": rss_loaded - rss_before,
+        "first_hit_ns": per_call_ns(dictionary.resolve, hits),
+        "cached_hit_ns": per_call_ns(dictionary.resolve, hot),
+        "miss_ns": per_call_ns(dictionary.resolve, misses),
+        "random_word_ns": per_call_ns(lambda _: dictionary.random_word(), hits[:2000]),
+    }
+
+    # Caminho do event loop: palavras novas (fora do cache) via resolve_async
+    fresh = [w + "s" for w in hits[:2000]]
+    latencies = sorted(asyncio.run(async_latencies(dictionary, fresh)))
+    result["async_cold_p50_us"] = statistics.median(latencies) * 1e6
+    result["async_cold_p99_us"] = latencies[int(len(latencies) * 0.99)] * 1e6
+    result["rss_after_lookups_mb"] = rss_mb() - rss_before
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dictionary backend benchmark")
+    parser.add_argument("--difficulty", default="normal")
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--cache-size", type=int, default=50000)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--sample-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args)
+        return
+
+    if not get_dict_file(args.difficulty).exists():
+        print(f"Dictionary for '{args.difficulty}' not found, using 'easy' instead")
+        args.difficulty = "easy"
+
+    words = sorted(load_dictionary(args.difficulty))
+    rng = random.Random(0)
+    hits = rng.sample(words, min(args.samples, len(words)))
+    samples = {"hits": hits, "misses": [w + "qz" for w in hits]}
+    del words
+
+    # Gera (ou atualiza) o arquivo SQLite antes, para o tempo de build não entrar na medição
+    started = time.perf_counter()
+    open_sqlite_dictionary("pt", args.difficulty, get_dict_file(args.difficulty))
+    print(f"SQLite file ready in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(samples, f)
+        sample_file = f.name
+
+    results = []
+    try:
+        for backend in ("memory", "sqlite"):
+            output = subprocess.run(
+                [sys.executable, "-m", "app.tools.bench_dictionary", "--backend", backend,
+                 "--difficulty", args.difficulty, "--cache-size", str(args.cache_size), "--sample-file", sample_file],
+                capture_output=True, text=True, check=True,
+                cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    finally:
+        os.unlink(sample_file)
+
+    print(f"Dictionary '{args.difficulty}': {results[0]['words']} words, {len(hits)} samples")
+    rows = [
+        ("load (ms)", "load_ms", "{:.0f}"),
+        ("RSS after load (MB)", "rss_loaded_mb", "{:.1f}"),
+        ("RSS after lookups (MB)", "rss_after_lookups_mb", "{:.1f}"),
+        ("resolve, first hit (ns)", "first_hit_ns", "{:.0f}"),
+        ("resolve, cached hit (ns)", "cached_hit_ns", "{:.0f}"),
+        ("resolve, miss (ns)", "miss_ns", "{:.0f}"),
+        ("random_word (ns)", "random_word_ns", "{:.0f}"),
+        ("resolve_async, uncached p50 (µs)", "async_cold_p50_us", "{:.1f}"),
+        ("resolve_async, uncached p99 (µs)", "async_cold_p99_us", "{:.1f}"),
+    ]
+    print(f"  {'':<36}{'memory':>12}{'sqlite':>12}")
+    for label, key, fmt in rows:
+        print(f"  {label:<36}{fmt.format(results[0][key]):>12}{fmt.format(results[1][key]):>12}")
+
+
+if __name__ == "__main__":
+    main()
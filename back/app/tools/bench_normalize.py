@@ -0,0 +1,59 @@
+# Benchmark of the accent normalization cost on the word submission path.
+# Uso: python -m app.tools.bench_normalize [--difficulty normal] [--samples 20000]
+import argparse
+import os
+import random
+import sys
+import timeit
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.dictionary import registry, resolve_word, strip_accents
+
+
+def strip_accents_unicodedata(word: str) -> str:
+    """Per-call unicodedata approach, kept only as the comparison baseline."""
+    return "".join(c for c in unicodedata.normalize("NFD", word) if not unicodedata.combining(c))
+
+
+def bench(label: str, func, words: list[str]):
+    runs = 5
+    best = min(timeit.repeat(lambda: [func(w) for w in words], number=1, repeat=runs))
+    print(f"  {label:<44} {best / len(words) * 1e9:8.0f} ns/word")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accent normalization benchmark")
+    parser.add_argument("--difficulty", default="normal")
+    parser.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    dictionary = registry.get(difficulty=args.difficulty)
+    if not dictionary.words:
+        print(f"Dictionary for '{args.difficulty}' is empty, using 'easy' instead")
+        args.difficulty = "easy"
+        dictionary = registry.get(difficulty="easy")
+    words = dictionary.words
+
+    rng = random.Random(0)
+    exact = rng.sample(sorted(words), min(args.samples, len(words)))
+    index = dictionary.normalization_index
+    stripped = rng.sample(sorted(index), min(args.samples, len(index))) if index else []
+    misses = [w + "qz" for w in exact]
+    accented = [w.replace("a", "á", 1).replace("c", "ç", 1) for w in exact]
+
+    print(f"Dictionary '{args.difficulty}': {len(words)} words, {len(index)} accent-stripped keys")
+    bench("strip_accents (translate table)", strip_accents, exact)
+    bench("strip_accents (unicodedata per call)", strip_accents_unicodedata, exact)
+    bench("strip_accents, accented input (table)", strip_accents, accented)
+    bench("strip_accents, accented input (unicodedata)", strip_accents_unicodedata, accented)
+    bench("set lookup only (old verify_word)", lambda w: w.lower() in words, exact)
+    bench("resolve_word, exact hit", lambda w: resolve_word(w, args.difficulty), exact)
+    if stripped:
+        bench("resolve_word, typed without accents", lambda w: resolve_word(w, args.difficulty), stripped)
+    bench("resolve_word, miss", lambda w: resolve_word(w, args.difficulty), misses)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Burst benchmark of the speed round mode: every player submits at once and the engine arbitrates.
+# Uso: python -m app.tools.bench_speed_round [--players 150] [--rounds 200] [--valid-rate 0.3]
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.classes.game_engine import GameEngine, NullTransport, SPEED_ROUND_PAUSE
+from app.utils.clock import VirtualClock
+
+GAME_ID = "speed"
+
+
+class CountingTransport(NullTransport):
+    """Counts rejections by reason and speed round results."""
+
+    def __init__(self):
+        super().__init__()
+        self.rejections = Counter()
+        self.results = 0
+
+    async def emit(self, message: dict, room: str = None, to: str = None):
+        self.emitted += 1
+        if message["type"] == "word_rejected":
+            self.rejections[message["reason"]] += 1
+        elif message["type"] == "speed_round_result" and message["winner"]:
+            self.results += 1
+
+
+async def bench(players: int, rounds: int, valid_rate: float, difficulty: str, seed: int):
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    transport = CountingTransport()
+    engine = GameEngine(transport, clock)
+
+    # O host escolhe o modo speed antes dos outros entrarem (ele aumenta o limite da sala)
+    await engine.connect(GAME_ID, "p-0", "player-0")
+    room = engine.rooms[GAME_ID]
+    room["difficulty"] = difficulty
+    await engine.update_room_settings(GAME_ID, {"mode": "speed", "round_limit": rounds + 1}, "p-0")
+    for i in range(1, players):
+        await engine.connect(GAME_ID, f"p-{i}", f"player-{i}")
+    await engine.start_new_game(GAME_ID)
+
+    index = engine.get_room_dictionary(room).word_index
+    # Os índices recém-criados disparariam uma coleta completa no meio da primeira rajada
+    gc.collect()
+    burst_times = []
+    for _ in range(rounds):
+        letter = engine.get_expected_letter(room)
+        submissions = []
+        for i in range(players):
+            if rng.random() < valid_rate:
+                word = index.pick(letter, rng.randrange(3), room["used_words"], rng) or "zzz"
+            elif rng.random() < 0.5:
+                word = index.random_word(rng)
+            else:
+                word = "".join(rng.choice("abcdefghij") for _ in range(6))
+            submissions.append((f"p-{i}", word))
+        rng.shuffle(submissions)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(engine.handle_word_submission(GAME_ID, sid, word) for sid, word in submissions))
+        burst_times.append(time.perf_counter() - started)
+
+        await clock.advance(SPEED_ROUND_PAUSE)
+        if room["game_state"] != "playing":
+            break
+
+    return burst_times, transport, engine.command_queue_stats()[GAME_ID]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speed round burst benchmark")
+    parser.add_argument("--players", type=int, default=150)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--valid-rate", type=float, default=0.3)
+    parser.add_argument("--difficulty", default="easy")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    burst_times, transport, queue = asyncio.run(bench(args.players, args.rounds, args.valid_rate, args.difficulty, args.seed))
+
+    submissions = len(burst_times) * args.players
+    burst_times.sort()
+    print(f"{len(burst_times)} rounds x {args.players} concurrent submissions ({submissions} total)")
+    print(f"  burst p50 {statistics.median(burst_times) * 1000:.2f}ms, "
+          f"p99 {burst_times[int(len(burst_times) * 0.99)] * 1000:.2f}ms, "
+          f"per submission {sum(burst_times) / submissions * 1e6:.1f}µs")
+    print(f"  rounds won: {transport.results}, messages sent: {transport.emitted}")
+    print(f"  room queue: max depth {queue['max_depth']}, {queue['processed']} commands, "
+          f"{queue['rejected']} refused")
+    for reason, count in transport.rejections.most_common():
+        print(f"  rejected {count:>7} x {reason}")
+
+
+if __name__ == "__main__":
+    main()
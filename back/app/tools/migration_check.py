@@ -0,0 +1,159 @@
+# Drains one local worker into another and checks that the games resume there.
+# Starts two uvicorn processes on this host, plays with HTTP long-polling clients,
+# sends SIGUSR1 to the first worker and follows the clients to the second one.
+# Uso: python -m app.tools.migration_check [--rooms 3] [--port 8100]
+import argparse
+import json
+import os
+import queue
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class PollingClient:
+    """Minimal Socket.IO client over Engine.IO v4 long-polling (urllib only)."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.events: queue.Queue = queue.Queue()
+        self.closed = False
+        handshake = self._request("GET")
+        self.eio_sid = json.loads(handshake[1:handshake.index("}") + 1])["sid"]
+        self._request("POST", "40")
+        threading.Thread(target=self._poll, daemon=True).start()
+
+    def _url(self) -> str:
+        url = f"{self.base_url}/socket.io/?EIO=4&transport=polling&t={secrets.token_hex(4)}"
+        return url + (f"&sid={self.eio_sid}" if getattr(self, "eio_sid", None) else "")
+
+    def _request(self, method: str, body: str = None) -> str:
+        request = urllib.request.Request(self._url(), data=body.encode("utf-8") if body else None, method=method,
+                                         headers={"Content-Type": "text/plain;charset=UTF-8"})
+        with urllib.request.urlopen(request, timeout=40) as response:
+            return response.read().decode("utf-8")
+
+    def emit(self, event: str, data: dict):
+        self._request("POST", "42" + json.dumps([event, data]))
+
+    def _poll(self):
+        while not self.closed:
+            try:
+                payload = self._request("GET")
+            except Exception:
+                return
+            for packet in payload.split("\x1e"):
+                if packet == "2":
+                    self._request("POST", "3")
+                elif packet.startswith("42"):
+                    event, *args = json.loads(packet[2:])
+                    if event == "game_event":
+                        self.events.put(args[0])
+
+    def wait_for(self, event_type: str, timeout: float = 20.0) -> dict:
+        deadline = time.monotonic() + timeout
+        while True:
+            event = self.events.get(timeout=max(0.01, deadline - time.monotonic()))
+            if event["type"] == event_type:
+                return event
+
+    def close(self):
+        self.closed = True
+        try:
+            self._request("POST", "1")
+        except Exception:
+            pass
+
+
+def start_worker(port: int, token: str, peer_port: int = None) -> subprocess.Popen:
+    env = dict(os.environ, DRAIN_TOKEN=token, DICTIONARY_WATCH_INTERVAL="0", LOG_LEVEL="INFO")
+    if peer_port:
+        env["PEER_WORKER_URL"] = f"http://127.0.0.1:{peer_port}"
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.ws.game_manager:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACK_DIR, env=env
+    )
+
+
+def wait_ready(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=1).read()
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"worker on port {port} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Two-worker drain and room migration check")
+    parser.add_argument("--rooms", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    token = secrets.token_hex(16)
+    old_port, new_port = args.port, args.port + 1
+    peer = start_worker(new_port, token)
+    worker = start_worker(old_port, token, peer_port=new_port)
+    try:
+        wait_ready(old_port)
+        wait_ready(new_port)
+        old_url = f"http://127.0.0.1:{old_port}"
+
+        rooms = {}
+        for i in range(args.rooms):
+            game_id = f"MIG{i}"
+            clients = []
+            for name in ("ana", "bia"):
+                client = PollingClient(old_url)
+                client.emit("join_game", {"game_id": game_id, "player_name": f"{name}-{i}"})
+                joined = client.wait_for("player_joined")
+                clients.append((client, joined["player_id"]))
+            clients[0][0].emit("update_room_settings", {"settings": {"difficulty": "fácil"}})
+            clients[0][0].emit("start_new_game", {})
+            started = clients[0][0].wait_for("game_started")
+            rooms[game_id] = {"clients": clients, "word": started["current_word"]}
+        print(f"{args.rooms} room(s) playing on :{old_port}")
+
+        time.sleep(1.5)
+        drained_at = time.time()
+        os.kill(worker.pid, signal.SIGUSR1)
+
+        for game_id, room in rooms.items():
+            new_clients = []
+            for client, player_id in room["clients"]:
+                migrate = client.wait_for("migrate")
+                client.close()
+                moved = PollingClient(migrate["url"])
+                moved.emit("rejoin_game", {"game_id": game_id, "player_id": player_id,
+                                           "rejoin_secret": migrate["rejoin_secret"]})
+                state = moved.wait_for("room_state")
+                assert state["current_word"] == room["word"], "current word changed during migration"
+                new_clients.append(moved)
+            resumed = new_clients[0].wait_for("room_resumed")
+            timer = new_clients[0].wait_for("timer_started")
+            print(f"  {game_id}: resumed on :{new_port} after {resumed['paused'] * 1000:.0f}ms pause, "
+                  f"{timer['remaining_time']}s left on the turn")
+            for client in new_clients:
+                client.close()
+        print(f"drain + migration of {args.rooms} room(s) took {time.time() - drained_at:.2f}s end to end")
+    finally:
+        for process in (worker, peer):
+            process.terminate()
+        for process in (worker, peer):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                # Long-polling requests ainda abertos seguram o shutdown do uvicorn
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# Replays games from the binary event log through the GameEngine rules.
+# Uso: python -m app.tools.replay_log <event_log> [--game GAME_ID] [--dictionary LISTA_ARQUIVADA ...]
+import argparse
+import pathlib
+import sys
+import os
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.event_log import read_events
+from app.classes.game_engine import ROUND_LIMIT, GameEngine, NullTransport
+from app.utils.dictionary import DEFAULT_LANGUAGE, Dictionary, file_digest, registry
+
+
+def split_games(path: str, game_filter: str = None) -> list[tuple[str, list]]:
+    """Groups log records into individual games, delimited by game_started."""
+    games = []
+    open_games: dict[str, list] = {}
+
+    for event_type, timestamp, game_id, data in read_events(path):
+        if game_filter and game_id != game_filter:
+            continue
+        if event_type == "game_started":
+            open_games[game_id] = [(event_type, timestamp, data)]
+            games.append((game_id, open_games[game_id]))
+        elif game_id in open_games:
+            open_games[game_id].append((event_type, timestamp, data))
+            if event_type == "victory":
+                del open_games[game_id]
+
+    return games
+
+
+def load_archived(paths: list[str]) -> dict[str, Dictionary]:
+    """Archived word lists, keyed by the content hash recorded in game_started."""
+    archived = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            words = {line.strip().lower() for line in f if line.strip()}
+        dictionary = Dictionary(DEFAULT_LANGUAGE, pathlib.Path(path).stem, words, 0, None)
+        dictionary.content_hash = file_digest(pathlib.Path(path))
+        archived[dictionary.content_hash] = dictionary
+    return archived
+
+
+def pinned_dictionary(start: dict, archived: dict[str, Dictionary]) -> Optional[Dictionary]:
+    """
+    The dictionary version the game was played with, or None when it is no longer available.
+    Logs from before dictionary_hash was recorded are checked against the current list.
+    """
+    current = registry.get(start.get("language", DEFAULT_LANGUAGE), start["difficulty"])
+    recorded = start.get("dictionary_hash")
+    if recorded is None or recorded == current.content_hash:
+        return current
+    return archived.get(recorded)
+
+
+def replay_game(engine: GameEngine, records: list, archived: dict[str, Dictionary] = None) -> list[str]:
+    """
+    Re-runs one game and returns the list of divergences found.
+    Without the pinned dictionary version only the letter and repetition rules are checked.
+    """
+    _, _, start = records[0]
+    dictionary = pinned_dictionary(start, archived or {})
+    room = {
+        "dictionary": dictionary,
+        "current_word": start["initial_word"],
+        "difficulty": start["difficulty"],
+        "language": start.get("language", DEFAULT_LANGUAGE),
+        "used_words": {start["initial_word"].lower()},
+        "next_letter": start.get("next_letter"),
+    }
+    active = {p["id"] for p in start["turn_order"]}
+    # Logs antigos não têm o modo: eram todos de eliminação
+    mode = start.get("mode", "elimination")
+    scores = {player_id: 0 for player_id in active}
+    accepted = 0
+    problems = []
+
+    for event_type, timestamp, data in records[1:]:
+        if event_type == "word_submitted":
+            if data["player_id"] not in active:
+                problems.append(f"{data['player']} submitted '{data['word']}' while not active")
+
+            if dictionary is not None:
+                reject_code = engine.validate_word(room, data["word"])
+            elif data["reason"] == "not_in_dictionary":
+                # A lista mudou desde a partida: o veredito do dicionário não pode ser refeito
+                reject_code = "not_in_dictionary"
+            else:
+                reject_code = engine._check_rules(room, data["word"].lower())
+            if (reject_code is None) != data["accepted"] or (reject_code and reject_code != data["reason"]):
+                problems.append(
+                    f"'{data['word']}' by {data['player']}: logged "
+                    f"{'accepted' if data['accepted'] else data['reason']}, "
+                    f"replay {'accepted' if reject_code is None else reject_code}"
+                )
+
+            if data["accepted"]:
+                accepted += 1
+                scores[data["player_id"]] = scores.get(data["player_id"], 0) + data.get("score", 0)
+                room["current_word"] = data["word"]
+                room["used_words"].add(data["word"])
+                room["next_letter"] = data.get("next_letter")
+
+        elif event_type == "player_eliminated":
+            if data["player_id"] not in active:
+                problems.append(f"{data['player']} eliminated twice ({data['reason']})")
+            active.discard(data["player_id"])
+
+        elif event_type == "victory" and mode in ("points", "speed"):
+            problems.extend(check_score_victory(data, mode, start, scores, active, accepted))
+
+        elif event_type == "victory":
+            if len(active) > 1:
+                problems.append(f"victory declared with {len(active)} active players")
+            expected_winner = next(iter(active)) if active else None
+            if data["winner_id"] != expected_winner:
+                problems.append(f"logged winner {data['winner']} does not match the last active player")
+
+    if records[-1][0] != "victory":
+        problems.append("game has no victory record (still running or log truncated)")
+
+    return problems
+
+
+def check_score_victory(data: dict, mode: str, start: dict, scores: dict, active: set, accepted: int) -> list[str]:
+    """Points and speed games: nobody is eliminated, the top score wins once the round limit is reached."""
+    problems = []
+    top = max(scores.values(), default=0)
+    if data["winner_id"] is not None and scores.get(data["winner_id"], 0) < top:
+        problems.append(f"logged winner {data['winner']} has {scores.get(data['winner_id'], 0)} points, "
+                        f"the top score is {top}")
+    # Com um jogador ou menos a partida acaba antes do limite (os outros saíram)
+    if len(active) > 1:
+        limit = start.get("round_limit", ROUND_LIMIT)
+        required = limit if mode == "speed" else limit * len(active)
+        turns = data.get("turns_taken", 0)
+        if turns < required:
+            problems.append(f"victory after {turns} turns, the round limit needs {required}")
+        if accepted > turns:
+            problems.append(f"{accepted} accepted words in only {turns} turns")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify games recorded in the event log")
+    parser.add_argument("path", help="Path to the event log file")
+    parser.add_argument("--game", help="Only replay this game_id")
+    parser.add_argument("--dictionary", action="append", default=[],
+                        help="Archived word list for games played with an older dictionary (repeatable)")
+    args = parser.parse_args()
+
+    engine = GameEngine(NullTransport())
+    archived = load_archived(args.dictionary)
+    games = split_games(args.path, args.game)
+    failed = 0
+
+    for game_id, records in games:
+        problems = replay_game(engine, records, archived)
+        words = sum(1 for r in records if r[0] == "word_submitted")
+        if pinned_dictionary(records[0][2], archived) is None:
+            print(f"⚠️  {game_id}: dictionary {records[0][2]['dictionary_hash']} not available, "
+                  f"words checked for letter and repetition only (pass it with --dictionary)")
+        if problems:
+            failed += 1
+            print(f"❌ {game_id}: {words} submissions, {len(problems)} divergences")
+            for problem in problems:
+                print(f"   - {problem}")
+        else:
+            print(f"✅ {game_id}: {words} submissions verified")
+
+    print(f"{len(games)} games replayed, {failed} with divergences")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
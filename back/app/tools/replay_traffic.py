@@ -0,0 +1,367 @@
+# Replays captured Socket.IO traffic (TRAFFIC_CAPTURE_PATH) through the ASGI app on a virtual clock,
+# and compares the reports of two builds.
+# Uso: python -m app.tools.replay_traffic captura.jsonl [--speed 20] [--report base.json]
+#      python -m app.tools.replay_traffic --compare base.json novo.json [--threshold 0.1]
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict, deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.clock import VirtualClock
+from app.utils.ngram_index import word_grams
+from app.utils.traffic_capture import read_capture
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Conexão WebSocket direto no app ASGI, sem rede
+SCOPE = {
+    "type": "websocket",
+    "asgi": {"version": "3.0"},
+    "scheme": "ws",
+    "path": "/socket.io/",
+    "query_string": b"EIO=4&transport=websocket",
+    "headers": [(b"upgrade", b"websocket"), (b"connection", b"Upgrade")],
+    "client": ("127.0.0.1", 0),
+    "server": ("replay", 80)
+}
+# Eventos com menos amostras que isso não entram na detecção de regressões
+MIN_SAMPLES = 20
+
+
+class ReplayStats:
+    """Latency of every replayed event, measured until the server acks it."""
+
+    def __init__(self):
+        self.latency: dict[str, list[float]] = defaultdict(list)
+        self.pending: set[asyncio.Future] = set()
+        self.sent = 0
+        self.received = 0
+
+    def track(self, event: str, future: asyncio.Future, sent_at: float):
+        self.sent += 1
+        self.pending.add(future)
+        future.add_done_callback(lambda f: self._done(event, f, sent_at))
+
+    def _done(self, event: str, future: asyncio.Future, sent_at: float):
+        self.pending.discard(future)
+        if not future.cancelled() and future.exception() is None:
+            self.latency[event].append(future.result() - sent_at)
+
+    async def settle(self, timeout: float = 30.0):
+        """Wait for every event in flight."""
+        if self.pending:
+            await asyncio.wait(set(self.pending), timeout=timeout)
+
+
+class ReplayConnection:
+    """One client speaking Socket.IO over an in-memory WebSocket plugged into the ASGI app."""
+
+    def __init__(self, app, stats: ReplayStats):
+        self.stats = stats
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._acks: dict[int, asyncio.Future] = {}
+        self._ack_ids = itertools.count()
+        self._ready = asyncio.get_running_loop().create_future()
+        self._inbox.put_nowait({"type": "websocket.connect"})
+        self._task = asyncio.create_task(app(dict(SCOPE), self._inbox.get, self._send))
+
+    @classmethod
+    async def open(cls, app, stats: ReplayStats) -> "ReplayConnection":
+        connection = cls(app, stats)
+        sent_at = time.perf_counter()
+        stats.track("connect", connection._ready, sent_at)
+        await connection._ready
+        return connection
+
+    def emit(self, event: str, data: dict):
+        ack_id = next(self._ack_ids)
+        future = self._acks[ack_id] = asyncio.get_running_loop().create_future()
+        self.stats.track(event, future, time.perf_counter())
+        self._put(f"42{ack_id}" + json.dumps([event, data], separators=(",", ":"), ensure_ascii=False))
+
+    async def close(self):
+        self._inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        for future in self._acks.values():
+            future.cancel()
+
+    def _put(self, packet: str):
+        self._inbox.put_nowait({"type": "websocket.receive", "text": packet})
+
+    async def _send(self, message: dict):
+        if message["type"] == "websocket.close" and not self._ready.done():
+            self._ready.set_exception(ConnectionError(message.get("reason") or "connection refused"))
+        if message["type"] != "websocket.send" or message.get("text") is None:
+            return
+        packet = message["text"]
+        if packet.startswith("0"):
+            # Handshake do Engine.IO: conecta no namespace padrão
+            self._put("40")
+        elif packet == "2":
+            self._put("3")
+        elif packet.startswith("40") and not self._ready.done():
+            self._ready.set_result(time.perf_counter())
+        elif packet.startswith("43"):
+            ack_id = int(packet[2:packet.index("[")])
+            future = self._acks.pop(ack_id, None)
+            if future and not future.done():
+                future.set_result(time.perf_counter())
+        else:
+            self.stats.received += 1
+
+
+class SeedSink:
+    """
+    Event sink of the replay: starts every game like the recorded one (initial word and
+    turn order), so the recorded submissions meet the same word chain, and counts the
+    outcomes used to check that two builds played the same games.
+    """
+
+    def __init__(self, engine, seeds: dict[str, deque]):
+        self.engine = engine
+        self.seeds = seeds
+        self.outcomes = Counter()
+
+    def record(self, game_id: str, event_type: str, data: dict):
+        if event_type == "word_submitted":
+            self.outcomes["word_accepted" if data["accepted"] else f"word_{data['reason']}"] += 1
+        elif event_type in ("game_started", "player_eliminated", "victory"):
+            self.outcomes[event_type] += 1
+        if event_type != "game_started" or not self.seeds.get(game_id):
+            return
+
+        seed = self.seeds[game_id].popleft()
+        room = self.engine.rooms[game_id]
+        word = seed["initial_word"]
+        room["current_word"] = word
+        room["used_words"] = {word.lower()}
+        if room["difficulty"] == "fragment":
+            room["used_grams"] = Counter(word_grams(word))
+        if room["difficulty"] in ("caotic", "fragment"):
+            room["next_letter"] = seed["next_letter"]
+        ids = {p.name: p.id for p in room["players"]}
+        order = [ids[name] for name in seed["turn_order"] if name in ids]
+        if sorted(order) == sorted(room["turn_order"]):
+            room["turn_order"] = order
+
+
+def load_capture(path: str, room: str = None) -> tuple[list[dict], dict[str, deque]]:
+    """Inbound events sorted by time, and the recorded game starts of each room."""
+    events, seeds = [], defaultdict(deque)
+    for line in read_capture(path):
+        if "seed" in line:
+            seeds[line["room"]].append(line["seed"])
+        else:
+            events.append(line)
+    if room:
+        # Todas as conexões que passaram pela sala, do connect ao disconnect
+        connections = {e["conn"] for e in events if e.get("room") == room}
+        events = [e for e in events if e["conn"] in connections]
+        seeds = {room: seeds.get(room, deque())}
+    events.sort(key=lambda e: e["t"])
+    return events, seeds
+
+
+def warm_dictionaries(events: list[dict]):
+    """
+    Load the word lists and the suggestion buckets of the submitted first letters before
+    the clock starts, so the replay measures a warm worker instead of one-off index builds.
+    """
+    from app.utils.dictionary import DEFAULT_LANGUAGE, DIFFICULTY_LISTS, get_dict_file, registry
+    languages, letters = {DEFAULT_LANGUAGE}, set()
+    for event in events:
+        data = event.get("data") or {}
+        settings = data.get("settings")
+        if isinstance(settings, dict) and settings.get("language"):
+            languages.add(settings["language"])
+        if event["event"] == "submit_word" and data.get("word"):
+            letters.add(str(data["word"]).lower().strip()[:1])
+    for language in languages:
+        for list_name in set(DIFFICULTY_LISTS.values()):
+            if not get_dict_file(list_name, language).exists():
+                continue
+            dictionary = registry.get(language, list_name)
+            for letter in filter(None, letters):
+                dictionary.suggestions.build_bucket(letter)
+
+
+async def replay(events: list[dict], seeds: dict[str, deque], speed: float, max_idle: float) -> dict:
+    # Importado aqui: o módulo lê as variáveis de ambiente ao ser carregado
+    from app.ws import game_manager
+    engine = game_manager.manager
+    clock = VirtualClock(start=events[0]["t"])
+    engine.clock = clock
+    sink = SeedSink(engine, seeds)
+    engine.event_sinks.append(sink)
+
+    stats = ReplayStats()
+    connections: dict[str, ReplayConnection] = {}
+    started = time.perf_counter()
+    for event in events:
+        gap = event["t"] - clock.now
+        if gap > 0:
+            # O relógio só anda depois que tudo que chegou antes foi processado:
+            # timers (time up, rodadas speed, bots) disparam no mesmo ponto em qualquer velocidade
+            await stats.settle()
+            if speed:
+                await asyncio.sleep(min(gap / speed, max_idle))
+            await clock.advance(gap)
+
+        name = event["event"]
+        connection = connections.get(event["conn"])
+        if name == "disconnect":
+            if connection:
+                await connections.pop(event["conn"]).close()
+            continue
+        if connection is None:
+            connection = connections[event["conn"]] = await ReplayConnection.open(game_manager.app, stats)
+        if name != "connect":
+            connection.emit(name, event.get("data") or {})
+
+    await stats.settle()
+    wall_time = time.perf_counter() - started
+    for connection in connections.values():
+        await connection.close()
+
+    return {
+        "speed": speed,
+        "events": stats.sent,
+        "wall_time": round(wall_time, 3),
+        "virtual_time": round(clock.now - events[0]["t"], 3),
+        "throughput": round(stats.sent / wall_time, 1),
+        "messages_received": stats.received,
+        "latency_ms": {name: summarize(samples) for name, samples in sorted(stats.latency.items())},
+        "outcomes": dict(sorted(sink.outcomes.items()))
+    }
+
+
+def summarize(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 3)
+    return {"count": len(samples), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": pick(1.0)}
+
+
+def build_label() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACK_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(report: dict):
+    print(f"[{report['label']}] {report['events']} events in {report['wall_time']:.2f}s "
+          f"({report['virtual_time']:.0f}s of captured traffic at {speed_label(report['speed'])}), "
+          f"{report['throughput']:,.0f} events/s")
+    for name, s in report["latency_ms"].items():
+        print(f"  {name:<22} {s['count']:>7} x  p50 {s['p50']:8.3f}ms  p95 {s['p95']:8.3f}ms  "
+              f"p99 {s['p99']:8.3f}ms  max {s['max']:8.3f}ms")
+    print("  outcomes: " + ", ".join(f"{k}={v}" for k, v in report["outcomes"].items()))
+
+
+def speed_label(speed: float) -> str:
+    return f"{speed:g}x" if speed else "full speed"
+
+
+def compare(base: dict, new: dict, threshold: float) -> list[str]:
+    """Print the differences between two reports and return the regressions above the threshold."""
+    regressions = []
+    print(f"{base['label']} -> {new['label']}")
+    if base["speed"] != new["speed"] or base["events"] != new["events"]:
+        print(f"  ⚠️  reports come from different replays ({base['events']} events at {speed_label(base['speed'])} "
+              f"vs {new['events']} at {speed_label(new['speed'])})")
+
+    change = new["throughput"] / base["throughput"] - 1
+    print(f"  throughput {base['throughput']:>10,.0f} -> {new['throughput']:>10,.0f} events/s ({change:+.1%})")
+    # Com ritmo (speed > 0) a vazão é a do tráfego gravado, não a do servidor
+    if change < -threshold and not base["speed"] and not new["speed"]:
+        regressions.append(f"throughput {change:+.1%}")
+
+    for name in sorted(set(base["latency_ms"]) | set(new["latency_ms"])):
+        old, cur = base["latency_ms"].get(name), new["latency_ms"].get(name)
+        if not old or not cur:
+            print(f"  {name:<22} only in {'new' if cur else 'base'}")
+            continue
+        changes = {q: cur[q] / old[q] - 1 if old[q] else 0.0 for q in ("p50", "p95", "p99")}
+        print(f"  {name:<22} " + "  ".join(f"{q} {old[q]:7.3f} -> {cur[q]:7.3f}ms ({changes[q]:+.0%})"
+                                          for q in ("p50", "p95", "p99")))
+        if min(old["count"], cur["count"]) >= MIN_SAMPLES and changes["p95"] > threshold:
+            regressions.append(f"{name} p95 {changes['p95']:+.0%}")
+
+    if base["outcomes"] != new["outcomes"]:
+        # Outra sequência de jogo: a comparação de latência vale menos
+        diff = {k: (base["outcomes"].get(k, 0), new["outcomes"].get(k, 0))
+                for k in set(base["outcomes"]) | set(new["outcomes"])
+                if base["outcomes"].get(k, 0) != new["outcomes"].get(k, 0)}
+        print(f"  ⚠️  the builds played different games: {diff}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-compressed replay of captured Socket.IO traffic")
+    parser.add_argument("capture", nargs="?", help="File written with TRAFFIC_CAPTURE_PATH")
+    parser.add_argument("--speed", type=float, default=10.0, help="Replay speed (1 = real time, 0 = as fast as possible)")
+    parser.add_argument("--max-idle", type=float, default=1.0, help="Longest real wait between two events (s)")
+    parser.add_argument("--room", help="Replay only the connections of this (pseudonymized) room")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cold", action="store_true", help="Skip the warm-up (measure a freshly started worker)")
+    parser.add_argument("--label", help="Build name in the report (default: git commit)")
+    parser.add_argument("--report", help="Write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two JSON reports")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed p95/throughput regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold)
+        if regressions:
+            print("❌ regressions: " + ", ".join(regressions))
+            sys.exit(1)
+        print("✅ no regression above the threshold")
+        return
+    if not args.capture:
+        parser.error("a capture file (or --compare) is required")
+
+    # A replay não pode gravar em arquivos de produção nem capturar a si mesma
+    for var in ("TRAFFIC_CAPTURE_PATH", "EVENT_LOG_PATH", "STATS_DB_PATH", "TRACE_EXPORT_PATH",
+                "TRACE_OTLP_ENDPOINT", "PEER_WORKER_URL"):
+        os.environ.pop(var, None)
+    os.environ["DICTIONARY_WATCH_INTERVAL"] = "0"
+    logging.disable(logging.INFO)
+    random.seed(args.seed)
+
+    events, seeds = load_capture(args.capture, args.room)
+    if not events:
+        print("No events in the capture")
+        return
+    if not args.cold:
+        warm_dictionaries(events)
+
+    # O servidor imprime cada conexão e desconexão
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = asyncio.run(replay(events, seeds, args.speed, args.max_idle))
+    report = {"label": args.label or build_label(), **result}
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
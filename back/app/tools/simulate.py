@@ -0,0 +1,128 @@
+# Headless high-speed simulator: plays games through GameEngine with a virtual clock.
+# Uso: python -m app.tools.simulate --turns 200000 --players 4 --difficulty easy
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.classes.game_engine import GameEngine, NullTransport
+from app.utils.clock import VirtualClock
+from app.utils.dictionary import registry
+
+GAME_ID = "sim"
+
+
+def check_invariants(engine: GameEngine, game_id: str, full: bool = False):
+    """Raise AssertionError when the room reaches an inconsistent state."""
+    room = engine.rooms[game_id]
+    if room["game_state"] != "playing":
+        return
+
+    active_ids = {p.id for p in room["players"] if p.is_active}
+    assert len(active_ids) >= 2, f"playing with {len(active_ids)} active players"
+    assert room["current_player_index"] < len(room["turn_order"]), "current_player_index out of bounds"
+    assert set(room["turn_order"]) <= active_ids, "inactive player in turn_order"
+    assert engine.get_current_player_info(game_id) is not None, "no current player while playing"
+    assert game_id in engine.timer_tasks, "no turn timer while playing"
+    if full:
+        assert room["current_word"] in room["used_words"], "current word missing from used_words"
+
+
+def fuzz_word(rng: random.Random, words_by_letter: dict, expected: str, valid_rate: float) -> str:
+    """Pick a word for the expected letter, or a deliberately bad submission."""
+    roll = rng.random()
+    if roll < valid_rate and words_by_letter.get(expected):
+        return rng.choice(words_by_letter[expected])
+    if roll < valid_rate + (1 - valid_rate) / 2:
+        letter = rng.choice(list(words_by_letter))
+        return rng.choice(words_by_letter[letter])
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyzçãé") for _ in range(rng.randint(1, 12)))
+
+
+async def simulate(turns: int, players: int, difficulty: str, valid_rate: float, timeout_rate: float, seed: int,
+                   cold: bool = False):
+    rng = random.Random(seed)
+    random.seed(seed)
+
+    dictionary = registry.get(difficulty=difficulty)
+    words_by_letter = defaultdict(list)
+    for word in dictionary.words:
+        words_by_letter[word[0]].append(word)
+    if not cold:
+        # Os buckets de sugestão são construídos uma vez por letra numa thread; fora da medição,
+        # senão ela mede a disputa do GIL com essa construção e não o motor
+        for letter in words_by_letter:
+            registry.build_suggestions(dictionary, letter)
+
+    clock = VirtualClock()
+    engine = GameEngine(NullTransport(), clock)
+    for i in range(players):
+        await engine.connect(GAME_ID, f"sim-{i}", f"bot-{i}")
+    room = engine.rooms[GAME_ID]
+    room["difficulty"] = difficulty
+
+    path_time = defaultdict(int)
+    path_count = defaultdict(int)
+    games = 0
+    started = time.perf_counter()
+
+    for turn in range(turns):
+        if room["game_state"] != "playing":
+            await engine.reset_game(GAME_ID)
+            await engine.start_new_game(GAME_ID)
+            games += 1
+
+        if rng.random() < timeout_rate:
+            path = "time_up"
+            before = time.perf_counter_ns()
+            await clock.advance(room["remaining_time"])
+        else:
+            current = engine.get_current_player_info(GAME_ID)
+            sid = next(p.websocket for p in room["players"] if p.id == current["id"])
+            word = fuzz_word(rng, words_by_letter, engine.get_expected_letter(room), valid_rate)
+            reject_code = engine.validate_word(room, word)
+            path = reject_code or "accepted"
+            before = time.perf_counter_ns()
+            await engine.handle_word_submission(GAME_ID, sid, word)
+        path_time[path] += time.perf_counter_ns() - before
+        path_count[path] += 1
+
+        check_invariants(engine, GAME_ID, full=turn % 1000 == 0)
+
+    elapsed = time.perf_counter() - started
+    engine._stop_turn_timer(GAME_ID)
+    return elapsed, games, path_time, path_count, engine.transport.emitted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Word Tower simulator")
+    parser.add_argument("--turns", type=int, default=200000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--difficulty", default="easy")
+    parser.add_argument("--valid-rate", type=float, default=0.8, help="Share of submissions that target the expected letter")
+    parser.add_argument("--timeout-rate", type=float, default=0.02, help="Share of turns that end by time up")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cold", action="store_true",
+                        help="Skip the suggestion index warm-up (its builds then run during the measurement)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    elapsed, games, path_time, path_count, emitted = asyncio.run(simulate(
+        args.turns, args.players, args.difficulty, args.valid_rate, args.timeout_rate, args.seed, args.cold
+    ))
+
+    print(f"{args.turns} turns in {elapsed:.2f}s ({args.turns / elapsed * 60:,.0f} turns/min), "
+          f"{games} games, {emitted} events emitted")
+    for path in sorted(path_count, key=path_count.get, reverse=True):
+        mean_us = path_time[path] / path_count[path] / 1000
+        print(f"  {path:<18} {path_count[path]:>9} x {mean_us:8.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
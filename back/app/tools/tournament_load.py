@@ -0,0 +1,121 @@
+# Simulated-load run of a large tournament, without real Socket.IO clients.
+# Uso: python -m app.tools.tournament_load --players 3000 --room-size 6
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.ws import game_manager
+
+
+class LoadServer:
+    """In-process stand-in for the Socket.IO server methods used by the game code."""
+
+    def __init__(self):
+        self.sessions: dict[str, dict] = {}
+        self.emitted = 0
+
+    async def save_session(self, sid, session, namespace=None):
+        self.sessions[sid] = session
+
+    async def get_session(self, sid, namespace=None):
+        return self.sessions.get(sid, {})
+
+    async def enter_room(self, sid, room, namespace=None):
+        pass
+
+    async def leave_room(self, sid, room, namespace=None):
+        pass
+
+    async def emit(self, event, data=None, to=None, room=None, **kwargs):
+        self.emitted += 1
+
+    def install(self, sio):
+        for name in ("save_session", "get_session", "enter_room", "leave_room", "emit"):
+            setattr(sio, name, getattr(self, name))
+
+
+async def monitor_loop_lag(stats: dict, interval: float = 0.01):
+    """Measure how late the event loop wakes up a sleeping task."""
+    while True:
+        before = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = time.perf_counter() - before - interval
+        stats["max_lag"] = max(stats["max_lag"], lag)
+        stats["samples"] += 1
+
+
+async def play_rooms(manager, tournament_id: str, turn_delay: float):
+    """Simulate players timing out in every running room of the tournament."""
+    while True:
+        await asyncio.sleep(turn_delay)
+        for game_id, room in list(manager.rooms.items()):
+            if not game_id.startswith(tournament_id) or room["game_state"] != "playing":
+                continue
+            current = manager.get_current_player_info(game_id)
+            if current and random.random() < 0.5:
+                await manager.eliminate_player_by_id(game_id, current["id"])
+
+
+async def run(players: int, room_size: int, batch_size: int, turn_delay: float):
+    server = LoadServer()
+    server.install(game_manager.sio)
+    manager = game_manager.manager
+    tournaments = game_manager.tournaments
+    tournaments.batch_size = batch_size
+
+    lag = {"max_lag": 0.0, "samples": 0}
+    monitor = asyncio.create_task(monitor_loop_lag(lag))
+
+    tournaments.create("load", "owner", room_size)
+    for i in range(players):
+        await tournaments.register("load", f"sid-{i}", f"player-{i}")
+
+    started = time.perf_counter()
+    await tournaments.start("load", "owner")
+    setup_time = time.perf_counter() - started
+    setup_lag = lag["max_lag"]
+
+    player = asyncio.create_task(play_rooms(manager, "load", turn_delay))
+    while "load" in tournaments.tournaments:
+        await asyncio.sleep(0.05)
+    total_time = time.perf_counter() - started
+
+    player.cancel()
+    monitor.cancel()
+    return {
+        "setup_time": setup_time,
+        "setup_lag": setup_lag,
+        "total_time": total_time,
+        "max_lag": lag["max_lag"],
+        "emitted": server.emitted
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated-load tournament run")
+    parser.add_argument("--players", type=int, default=3000)
+    parser.add_argument("--room-size", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--turn-delay", type=float, default=0.05, help="Seconds between simulated timeouts")
+    args = parser.parse_args()
+
+    # O GameManager registra muito log por turno; silenciado durante a carga
+    logging.disable(logging.INFO)
+    result = asyncio.run(run(args.players, args.room_size, args.batch_size, args.turn_delay))
+
+    rooms = -(-args.players // args.room_size)
+    print(f"Players: {args.players} | first-level rooms: {rooms}")
+    print(f"Level 1 setup: {result['setup_time'] * 1000:.1f}ms "
+          f"(max event loop lag during setup: {result['setup_lag'] * 1000:.1f}ms)")
+    print(f"Tournament finished in {result['total_time']:.2f}s, "
+          f"max event loop lag {result['max_lag'] * 1000:.1f}ms, {result['emitted']} emits")
+
+
+if __name__ == "__main__":
+    main()
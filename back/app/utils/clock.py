@@ -0,0 +1,74 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class SystemClock:
+    """Wall-clock time and real asyncio sleeps."""
+
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Manually advanced clock for simulations.
+
+    sleep() only returns once advance() moves the virtual time past the wake-up
+    time, so timer-driven paths fire deterministically and as fast as the
+    caller wants.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._sleepers: list = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + seconds, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._cancelled += 1
+            if self._cancelled > len(self._sleepers) // 2:
+                self._compact()
+            raise
+
+    async def advance(self, seconds: float):
+        """Move time forward, waking sleepers in order and letting them run."""
+        target = self.now + seconds
+        # Tarefas recém-criadas ainda não registraram seu primeiro sleep
+        await asyncio.sleep(0)
+        while self._sleepers and self._sleepers[0][0] <= target:
+            wake_time, _, future = heapq.heappop(self._sleepers)
+            if future.done():
+                self._cancelled = max(0, self._cancelled - 1)
+                continue
+            self.now = wake_time
+            future.set_result(None)
+            # Deixa a tarefa acordada executar antes de avançar mais
+            for _ in range(3):
+                await asyncio.sleep(0)
+        self.now = target
+
+    def pending(self) -> int:
+        """Number of sleepers still waiting."""
+        return sum(1 for _, _, future in self._sleepers if not future.done())
+
+    def _compact(self):
+        self._sleepers = [entry for entry in self._sleepers if not entry[2].done()]
+        heapq.heapify(self._sleepers)
+        self._cancelled = 0
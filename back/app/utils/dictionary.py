@@ -1,56 +1,389 @@
+import asyncio
+import hashlib
+import logging
+import os
 import pathlib
 import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Union
+
+from app.utils.sqlite_dictionary import SqliteDictionary, open_sqlite_dictionary
+from app.utils.dictionary_shards import DictionaryShards
+from app.utils.ngram_index import NgramIndex
+from app.utils.scoring import ScoreTable
+from app.utils.suggestions import SuggestionIndex
+from app.utils.text import strip_accents
+from app.utils.word_index import WordIndex
+
+logger = logging.getLogger(__name__)
 
 DICT_PATH = pathlib.Path(__file__).parent.parent / "assets" / "dicts"
 
-def get_dict_file(difficulty: str) -> str:
+DEFAULT_LANGUAGE = "pt"
+# Lista de palavras usada por cada dificuldade ("caotic" e "fragment" usam a mesma lista do "normal")
+DIFFICULTY_LISTS = {"easy": "easy", "normal": "normal", "caotic": "normal", "fragment": "normal"}
+# Os arquivos do português ficam na raiz de DICT_PATH; outros idiomas em DICT_PATH/<idioma>/<lista>.txt
+PT_FILES = {"easy": "sem_acento.txt", "normal": "com_acento.txt"}
+# "memory" mantém cada lista num set; "sqlite" consulta um arquivo indexado com cache LRU
+BACKENDS = ("memory", "sqlite")
+
+def build_normalization_index(words: set[str]) -> dict[str, str]:
     """
-    Returns the appropriate dictionary file based on difficulty.
+    Maps the accent-stripped form of every accented word to its dictionary form.
+    When several words share the same stripped form, the first in alphabetical order wins.
     """
-    if difficulty.lower() == "normal":
-        return "com_acento.txt"
-    elif difficulty.lower() == "easy":
-        return "sem_acento.txt"
-    elif difficulty.lower() == "caotic":
-        return "com_acento.txt"
-    else:
-        return "sem_acento.txt"
+    index = {}
+    for word in sorted(words):
+        key = strip_accents(word)
+        if key != word and key not in index:
+            index[key] = word
+    return index
+
+def get_dict_file(difficulty: str, language: str = DEFAULT_LANGUAGE) -> pathlib.Path:
+    """
+    Returns the path of the dictionary file for a language and difficulty.
+    """
+    list_name = DIFFICULTY_LISTS.get(difficulty.lower(), "easy")
+    if language == DEFAULT_LANGUAGE:
+        return DICT_PATH / PT_FILES[list_name]
+    return DICT_PATH / language / f"{list_name}.txt"
+
+def file_digest(path: pathlib.Path) -> Optional[str]:
+    """Content hash of a word list file (identifies a dictionary version across restarts)."""
+    try:
+        with path.open("rb") as f:
+            return hashlib.file_digest(f, "sha1").hexdigest()[:16]
+    except FileNotFoundError:
+        return None
 
-def load_dictionary(difficulty: str) -> set[str]:
+def load_dictionary(difficulty: str, language: str = DEFAULT_LANGUAGE) -> set[str]:
     """
     Loads the dictionary file based on difficulty.
     """
-    dict_file = get_dict_file(difficulty)
-    dict_path = DICT_PATH / dict_file
+    dict_path = get_dict_file(difficulty, language)
     try:
         with dict_path.open(encoding="utf-8") as f:
             return {line.strip().lower() for line in f if line.strip()}
     except FileNotFoundError:
-        print(f"ERROR: Dictionary file {dict_file} not found.")
+        print(f"ERROR: Dictionary file {dict_path.name} not found.")
         return set()
 
-DICTIONARIES = {
-    "normal": load_dictionary("normal"),
-    "easy": load_dictionary("easy"),
-    "caotic": load_dictionary("normal")
-}
 
-def verify_word(word: str, difficulty: str = "normal") -> bool:
+class Dictionary:
+    """
+    One immutable version of a word list, with the structures derived from it.
+    The bot word index and the suggestion index are only built when first used.
+    """
+
+    def __init__(self, language: str, list_name: str, words: set[str], version: int = 1, mtime: Optional[float] = None):
+        self.language = language
+        self.list_name = list_name
+        self.version = version
+        self.mtime = mtime
+        # Hash do arquivo de origem, preenchido pelo registry (o version só vale dentro do processo)
+        self.content_hash: Optional[str] = None
+        self.words = words
+        # Lista pré-construída para sortear palavras sem converter o set a cada partida
+        self.word_list = tuple(words)
+        self.normalization_index = build_normalization_index(words)
+        self._word_index = None
+        self._suggestions = None
+        self._ngram_index = None
+        self._score_table = None
+        self._shards = None
+        self._lock = threading.Lock()
+        self.base_bytes = (
+            sys.getsizeof(words) + sys.getsizeof(self.word_list) + sys.getsizeof(self.normalization_index)
+            + sum(sys.getsizeof(word) for word in words)
+            + sum(sys.getsizeof(key) for key in self.normalization_index)
+        )
+
+    @property
+    def key(self) -> str:
+        return f"{self.language}/{self.list_name}"
+
+    def resolve(self, word: str) -> Optional[str]:
+        """
+        Returns the dictionary form of a submitted word, or None if it does not exist.
+        Accents are optional: "cafe" resolves to "café" when only the accented form exists.
+        """
+        word = word.lower().strip()
+        if word in self.words:
+            return word
+
+        key = strip_accents(word)
+        canonical = self.normalization_index.get(key)
+        if canonical:
+            return canonical
+        if key in self.words:
+            return key
+        return None
+
+    async def resolve_async(self, word: str) -> Optional[str]:
+        return self.resolve(word)
+
+    def random_word(self) -> str:
+        if not self.word_list:
+            return "casa"
+        return random.choice(self.word_list)
+
+    @property
+    def word_index(self) -> WordIndex:
+        if self._word_index is None:
+            with self._lock:
+                if self._word_index is None:
+                    self._word_index = WordIndex(self.words)
+        return self._word_index
+
+    @property
+    def suggestions(self) -> SuggestionIndex:
+        if self._suggestions is None:
+            with self._lock:
+                if self._suggestions is None:
+                    self._suggestions = SuggestionIndex(self.words)
+        return self._suggestions
+
+    @property
+    def ngram_index(self) -> NgramIndex:
+        if self._ngram_index is None:
+            with self._lock:
+                if self._ngram_index is None:
+                    self._ngram_index = NgramIndex(self.words)
+        return self._ngram_index
+
+    @property
+    def score_table(self) -> ScoreTable:
+        if self._score_table is None:
+            with self._lock:
+                if self._score_table is None:
+                    self._score_table = ScoreTable(self.words)
+        return self._score_table
+
+    @property
+    def shards(self) -> DictionaryShards:
+        if self._shards is None:
+            with self._lock:
+                if self._shards is None:
+                    self._shards = DictionaryShards(self.words)
+        return self._shards
+
+    def size_bytes(self) -> int:
+        """Approximate memory held by this version, including derived indexes built so far."""
+        size = self.base_bytes
+        if self._word_index is not None:
+            size += len(self.words) * 8
+        if self._suggestions is not None:
+            size += self._suggestions.memory_report()["bytes"]
+        if self._ngram_index is not None:
+            size += len(self._ngram_index.counts) * 100
+        if self._score_table is not None:
+            size += sys.getsizeof(self._score_table.scores)
+        if self._shards is not None:
+            size += self._shards.size_bytes()
+        return size
+
+
+AnyDictionary = Union[Dictionary, SqliteDictionary]
+
+
+class DictionaryRegistry:
+    """
+    Loads word lists on first use and keeps them in an LRU under a memory budget.
+
+    reload() builds a new Dictionary off to the side and swaps it in with a
+    single assignment, so readers always see a complete version. Rooms keep a
+    reference to the version they started with, which stays valid (and
+    consistent) after a reload or an eviction until the room resets.
+    """
+
+    def __init__(self, memory_budget: int, dict_path: pathlib.Path = DICT_PATH, backend: str = "memory"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown dictionary backend '{backend}'")
+        self.memory_budget = memory_budget
+        self.dict_path = dict_path
+        self.backend = backend
+        self._loaded: OrderedDict[tuple[str, str], AnyDictionary] = OrderedDict()
+        self._versions: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._watcher = None
+
+    def languages(self) -> list[str]:
+        """Available languages: Portuguese plus every subdirectory of the dictionaries folder."""
+        others = sorted(p.name for p in self.dict_path.iterdir() if p.is_dir()) if self.dict_path.exists() else []
+        return [DEFAULT_LANGUAGE] + [lang for lang in others if lang != DEFAULT_LANGUAGE]
+
+    def get(self, language: str = DEFAULT_LANGUAGE, difficulty: str = "normal") -> AnyDictionary:
+        """Return the current version of a list, loading it (blocking) if needed."""
+        key = self._key(language, difficulty)
+        with self._lock:
+            dictionary = self._loaded.get(key)
+            if dictionary is not None:
+                self._loaded.move_to_end(key)
+                return dictionary
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                dictionary = self._loaded.get(key)
+            if dictionary is None:
+                dictionary = self._build(key)
+                self._install(dictionary)
+        return dictionary
+
+    async def acquire(self, language: str = DEFAULT_LANGUAGE, difficulty: str = "normal") -> AnyDictionary:
+        """Like get(), but loads missing lists in a worker thread instead of the event loop."""
+        key = self._key(language, difficulty)
+        dictionary = self._loaded.get(key)
+        if dictionary is not None:
+            return dictionary
+        return await asyncio.to_thread(self.get, language, difficulty)
+
+    def reload(self, language: str = DEFAULT_LANGUAGE, difficulty: str = "normal") -> AnyDictionary:
+        """Build a new version of a list and swap it in atomically."""
+        dictionary = self._build(self._key(language, difficulty))
+        self._install(dictionary)
+        return dictionary
+
+    def reload_in_background(self, language: str = DEFAULT_LANGUAGE, difficulty: str = "normal") -> threading.Thread:
+        thread = threading.Thread(target=self.reload, args=(language, difficulty), name="dictionary-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def check_for_updates(self):
+        """Reload every loaded list whose file changed on disk."""
+        with self._lock:
+            loaded = list(self._loaded.values())
+        for dictionary in loaded:
+            try:
+                mtime = get_dict_file(dictionary.list_name, dictionary.language).stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if mtime != dictionary.mtime:
+                logger.info("📚 Dictionary %s changed on disk, reloading", dictionary.key)
+                self.reload(dictionary.language, dictionary.list_name)
+
+    def start_watcher(self, interval: float):
+        """Poll the loaded files for changes every interval seconds in a daemon thread."""
+        if self._watcher or interval <= 0:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.check_for_updates()
+                except Exception as e:
+                    logger.error("Dictionary watcher failed: %s", e)
+
+        self._watcher = threading.Thread(target=watch, name="dictionary-watcher", daemon=True)
+        self._watcher.start()
+
+    def build_suggestions(self, dictionary: AnyDictionary, letter: str):
+        """
+        Build one suggestion bucket of a list (blocking: run it in a worker thread).
+        Buckets count against the memory budget but never evict a list: a bucket that
+        does not fit next to the loaded lists is dropped, and that letter gets no suggestions.
+        """
+        index = dictionary.suggestions
+        index.build_bucket(letter)
+        with self._lock:
+            held = list(self._loaded.values())
+        if all(d is not dictionary for d in held):
+            held.append(dictionary)
+        total = sum(d.size_bytes() for d in held)
+        if total > self.memory_budget:
+            index.drop_bucket(letter)
+            logger.warning("💡 Suggestion bucket '%s' of %s dropped: %.1f MB over the memory budget",
+                           letter, dictionary.key, (total - self.memory_budget) / 1e6)
+
+    def close(self):
+        """Release what the loaded lists hold outside Python (SQLite connections)."""
+        with self._lock:
+            loaded = list(self._loaded.values())
+            self._loaded.clear()
+        for dictionary in loaded:
+            if isinstance(dictionary, SqliteDictionary):
+                dictionary.close()
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            return [{
+                "dictionary": d.key,
+                "version": d.version,
+                "words": len(d.words),
+                "bytes": d.size_bytes()
+            } for d in self._loaded.values()]
+
+    def _key(self, language: str, difficulty: str) -> tuple[str, str]:
+        language = (language or DEFAULT_LANGUAGE).lower()
+        if language != DEFAULT_LANGUAGE and not (self.dict_path / language).is_dir():
+            language = DEFAULT_LANGUAGE
+        return language, DIFFICULTY_LISTS.get((difficulty or "").lower(), "easy")
+
+    def _build(self, key: tuple[str, str]) -> AnyDictionary:
+        language, list_name = key
+        started = time.perf_counter()
+        path = get_dict_file(list_name, language)
+        with self._lock:
+            version = self._versions[key] = self._versions.get(key, 0) + 1
+
+        content_hash = file_digest(path)
+        if self.backend == "sqlite":
+            dictionary = open_sqlite_dictionary(language, list_name, path, version)
+            if dictionary is not None:
+                dictionary.content_hash = content_hash
+                logger.info("📚 Opened dictionary %s v%d from SQLite: %d words in %.0fms", dictionary.key,
+                            version, dictionary.count, (time.perf_counter() - started) * 1000)
+                return dictionary
+
+        mtime = path.stat().st_mtime if path.exists() else None
+        words = load_dictionary(list_name, language)
+        dictionary = Dictionary(language, list_name, words, version, mtime)
+        dictionary.content_hash = content_hash
+        logger.info("📚 Loaded dictionary %s v%d: %d words, ~%.1f MB in %.0fms", dictionary.key, version,
+                    len(words), dictionary.base_bytes / 1e6, (time.perf_counter() - started) * 1000)
+        return dictionary
+
+    def _install(self, dictionary: AnyDictionary):
+        key = (dictionary.language, dictionary.list_name)
+        with self._lock:
+            self._loaded[key] = dictionary
+            self._loaded.move_to_end(key)
+            total = sum(d.size_bytes() for d in self._loaded.values())
+            while total > self.memory_budget and len(self._loaded) > 1:
+                _, evicted = self._loaded.popitem(last=False)
+                total -= evicted.size_bytes()
+                logger.info("📚 Evicted dictionary %s v%d (memory budget)", evicted.key, evicted.version)
+
+
+registry = DictionaryRegistry(
+    int(os.getenv("DICTIONARY_MEMORY_BUDGET_MB", "512")) * 1024 * 1024,
+    backend=os.getenv("DICTIONARY_BACKEND", "memory").lower()
+)
+
+def resolve_word(word: str, difficulty: str = "normal", dictionary: Optional[AnyDictionary] = None) -> Optional[str]:
+    """
+    Returns the dictionary form of a submitted word, or None if it does not exist.
+    """
+    dictionary = dictionary or registry.get(DEFAULT_LANGUAGE, difficulty)
+    return dictionary.resolve(word)
+
+def verify_word(word: str, difficulty: str = "normal", dictionary: Optional[AnyDictionary] = None) -> bool:
     """
     Checks if the word exists in the dictionary for the given difficulty.
     """
-    dict_to_use = DICTIONARIES.get(difficulty.lower(), DICTIONARIES["easy"])
-    return word.lower() in dict_to_use
+    return resolve_word(word, difficulty, dictionary) is not None
 
-def get_random_word(difficulty: str = "normal") -> str:
+def get_random_word(difficulty: str = "normal", dictionary: Optional[AnyDictionary] = None) -> str:
     """
     Returns a random word from the dictionary to start a new game.
     """
-    dict_to_use = DICTIONARIES.get(difficulty.lower(), DICTIONARIES["normal"])
-    if not dict_to_use:
-        return "casa"
-    
-    return random.choice(list(dict_to_use))
+    dictionary = dictionary or registry.get(DEFAULT_LANGUAGE, difficulty)
+    return dictionary.random_word()
 
 def get_random_letter_from_word(word: str) -> str:
     """
@@ -59,4 +392,4 @@ def get_random_letter_from_word(word: str) -> str:
     """
     valid_letters = "abcdefghijklmnopqrstuvwxyz"
     valid_chars = [char for char in word.lower() if char in valid_letters]
-    return random.choice(valid_chars)
\ No newline at end of file
+    return random.choice(valid_chars)
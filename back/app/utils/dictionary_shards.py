@@ -0,0 +1,59 @@
+import gzip
+import hashlib
+from typing import Iterable
+
+from app.utils.text import strip_accents
+
+# Palavras que não começam com a-z (depois de remover acentos) vão para este shard
+OTHER_SHARD = "_"
+
+
+def shard_letter(word: str) -> str:
+    first = strip_accents(word[:1].lower())
+    return first if "a" <= first <= "z" else OTHER_SHARD
+
+
+class Shard:
+    """One gzip-compressed, newline-separated slice of a dictionary."""
+
+    def __init__(self, letter: str, words: list[str]):
+        raw = "\n".join(sorted(words)).encode("utf-8")
+        self.letter = letter
+        self.words = len(words)
+        self.hash = hashlib.sha1(raw).hexdigest()[:16]
+        self.etag = f'"{self.hash}"'
+        # mtime=0 deixa o gzip determinístico: o mesmo conteúdo sempre gera os mesmos bytes
+        self.gzipped = gzip.compress(raw, compresslevel=9, mtime=0)
+        self.raw_bytes = len(raw)
+
+    @property
+    def filename(self) -> str:
+        # O hash no nome permite cache "immutable": um conteúdo novo sempre tem outra URL
+        return f"{self.letter}.{self.hash}.txt"
+
+
+class DictionaryShards:
+    """Dictionary split by first letter, compressed once per dictionary version for HTTP clients."""
+
+    def __init__(self, words: Iterable[str]):
+        by_letter: dict[str, list[str]] = {}
+        for word in words:
+            by_letter.setdefault(shard_letter(word), []).append(word)
+        self.shards = {letter: Shard(letter, letter_words) for letter, letter_words in by_letter.items()}
+        self.by_filename = {shard.filename: shard for shard in self.shards.values()}
+        # Muda sempre que o conteúdo de algum shard muda (e só nesse caso)
+        self.version = hashlib.sha1(
+            "".join(f"{letter}:{shard.hash}\n" for letter, shard in sorted(self.shards.items())).encode("utf-8")
+        ).hexdigest()[:16]
+
+    def manifest(self, base_path: str) -> dict:
+        return {
+            letter: {
+                "path": f"{base_path}/{shard.filename}",
+                "words": shard.words,
+                "bytes": len(shard.gzipped)
+            } for letter, shard in sorted(self.shards.items())
+        }
+
+    def size_bytes(self) -> int:
+        return sum(len(shard.gzipped) for shard in self.shards.values())
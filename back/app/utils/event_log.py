@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Iterator, Optional
+
+# Formato do registro (little-endian):
+#   u32 tamanho do payload | payload
+#   payload = u8 código do evento | f64 timestamp | u16 tamanho do game_id | game_id | corpo JSON compacto
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<BdH")
+
+EVENT_CODES = {
+    "game_started": 1,
+    "word_submitted": 2,
+    "player_eliminated": 3,
+    "victory": 4,
+}
+EVENT_NAMES = {code: name for name, code in EVENT_CODES.items()}
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+def encode_record(event_type: str, timestamp: float, game_id: str, data: dict) -> bytes:
+    """Encodes one event as a length-prefixed binary record."""
+    game_id_bytes = (game_id or "").encode("utf-8")
+    body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    payload = _HEADER.pack(EVENT_CODES[event_type], timestamp, len(game_id_bytes)) + game_id_bytes + body
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def read_events(path: str) -> Iterator[tuple[str, float, str, dict]]:
+    """
+    Yields (event_type, timestamp, game_id, data) for every complete record in the log.
+    A truncated record at the end of the file (crash during a write) is ignored.
+    """
+    with open(path, "rb") as f:
+        while True:
+            size_bytes = f.read(_LENGTH.size)
+            if len(size_bytes) < _LENGTH.size:
+                return
+            (size,) = _LENGTH.unpack(size_bytes)
+            payload = f.read(size)
+            if len(payload) < size:
+                return
+
+            code, timestamp, game_id_len = _HEADER.unpack_from(payload)
+            offset = _HEADER.size
+            game_id = payload[offset:offset + game_id_len].decode("utf-8")
+            data = json.loads(payload[offset + game_id_len:].decode("utf-8"))
+            yield EVENT_NAMES.get(code, "unknown"), timestamp, game_id, data
+
+
+class EventLog:
+    """
+    Append-only game event log.
+
+    record() only encodes and enqueues; a background thread batches the records,
+    writes them and fsyncs every flush_interval seconds, so the event loop never
+    touches the disk.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, max_batch: int = 1024):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = open(path, "ab")
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, game_id: str, event_type: str, data: dict):
+        """Queues an event for writing. Unknown event types are ignored; a record that cannot be encoded is dropped."""
+        if self._closed or event_type not in EVENT_CODES:
+            return
+        try:
+            record = encode_record(event_type, time.time(), game_id, data)
+        except (TypeError, ValueError, struct.error) as e:
+            logger.error("Event log: dropped %s for room %r: %s", event_type, game_id, e)
+            return
+        self._queue.put(record)
+
+    def close(self):
+        """Flushes pending records and stops the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+
+    def _run(self):
+        last_sync = time.monotonic()
+        dirty = False
+        stopping = False
+
+        while not stopping:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_sync))
+            batch = []
+            try:
+                item = self._queue.get(timeout=timeout)
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.max_batch:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            if batch:
+                self._file.write(b"".join(batch))
+                dirty = True
+
+            if dirty and (stopping or time.monotonic() - last_sync >= self.flush_interval):
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                dirty = False
+                last_sync = time.monotonic()
+            elif not dirty:
+                last_sync = time.monotonic()
+
+
+def create_event_log_from_env() -> Optional[EventLog]:
+    """Creates the event log if EVENT_LOG_PATH is set."""
+    path = os.getenv("EVENT_LOG_PATH")
+    if not path:
+        return None
+    flush_interval = float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "1.0"))
+    return EventLog(path, flush_interval=flush_interval)
@@ -0,0 +1,105 @@
+import random
+import threading
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Iterable, Optional
+
+from app.utils.text import strip_accents
+
+FRAGMENT_SIZES = (2, 3)
+# Um fragmento só é sorteado se ainda houver pelo menos isto de palavras não usadas com ele
+MIN_FRAGMENT_WORDS = 20
+# Listas de palavras por fragmento mantidas em cache (usadas pelos bots)
+POSTINGS_CACHE_SIZE = 256
+
+_LETTERS = frozenset("abcdefghijklmnopqrstuvwxyz")
+
+
+_SLICES: dict[int, tuple[slice, ...]] = {}
+
+
+def _raw_grams(plain: str) -> set[str]:
+    # Fatias pré-calculadas por tamanho de palavra: o recorte roda inteiro em C
+    slices = _SLICES.get(len(plain))
+    if slices is None:
+        slices = _SLICES[len(plain)] = tuple(
+            slice(i, i + size) for size in FRAGMENT_SIZES for i in range(len(plain) - size + 1)
+        )
+    return set(map(plain.__getitem__, slices))
+
+
+def word_grams(word: str) -> set[str]:
+    """Distinct 2- and 3-letter fragments of a word, compared without accents."""
+    return {gram for gram in _raw_grams(strip_accents(word.lower())) if _LETTERS.issuperset(gram)}
+
+
+class NgramIndex:
+    """
+    Inverted index from 2-3 letter fragments to the number of words containing them.
+
+    Rooms keep a Counter of the fragments of their used words, so the number of
+    unused words containing a fragment is a subtraction of two dict lookups.
+    Full word lists per fragment are only materialized on demand (for bots)
+    and kept in a small LRU.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words = words
+        counts = Counter(chain.from_iterable(_raw_grams(strip_accents(word)) for word in words))
+        # Fragmentos com hífen, espaço etc. só são descartados no fim: bem mais rápido que filtrar por palavra
+        self.counts = Counter({gram: n for gram, n in counts.items() if _LETTERS.issuperset(gram)})
+        self._postings: OrderedDict[str, tuple[str, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def unused_count(self, gram: str, used_grams: Counter) -> int:
+        return self.counts.get(gram, 0) - used_grams.get(gram, 0)
+
+    def is_playable(self, gram: str, used_grams: Counter) -> bool:
+        return self.unused_count(gram, used_grams) >= MIN_FRAGMENT_WORDS
+
+    def choose_fragment(self, word: str, used_grams: Counter, rng: random.Random = random) -> tuple[str, int]:
+        """
+        Sample a playable fragment from word and return it with its position.
+        Falls back to the fragment of word with the most unused words when none is playable.
+        """
+        plain = strip_accents(word.lower())
+        candidates = []
+        for size in FRAGMENT_SIZES:
+            for i in range(len(plain) - size + 1):
+                gram = plain[i:i + size]
+                if _LETTERS.issuperset(gram):
+                    candidates.append((gram, i))
+        if not candidates:
+            return "", -1
+
+        playable = [c for c in candidates if self.is_playable(c[0], used_grams)]
+        if playable:
+            return rng.choice(playable)
+        return max(candidates, key=lambda c: self.unused_count(c[0], used_grams))
+
+    def words_containing(self, gram: str) -> tuple[str, ...]:
+        """Every word containing gram (scans the word list on a cache miss; call it off the event loop)."""
+        with self._lock:
+            found = self._postings.get(gram)
+            if found is not None:
+                self._postings.move_to_end(gram)
+                return found
+
+        found = tuple(word for word in self.words if gram in (word if word.isascii() else strip_accents(word)))
+        with self._lock:
+            self._postings[gram] = found
+            if len(self._postings) > POSTINGS_CACHE_SIZE:
+                self._postings.popitem(last=False)
+        return found
+
+    def pick(self, gram: str, used: set[str], rng: random.Random = random) -> Optional[str]:
+        """Return an unused word containing gram, or None."""
+        candidates = self.words_containing(gram)
+        if not candidates:
+            return None
+        start = rng.randrange(len(candidates))
+        for i in range(len(candidates)):
+            word = candidates[(start + i) % len(candidates)]
+            if word not in used:
+                return word
+        return None
@@ -0,0 +1,227 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_SIZE = 50
+# Nomes padrão (quem não escolheu um nome): somariam jogadores diferentes num registro só
+UNTRACKED_NAMES = {"", "anonymous"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS player_stats (
+    name TEXT PRIMARY KEY,
+    games_played INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    words_submitted INTEGER NOT NULL,
+    total_response_time REAL NOT NULL,
+    timed_words INTEGER NOT NULL,
+    longest_word TEXT NOT NULL
+)
+"""
+
+_UPSERT = """
+INSERT INTO player_stats VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET
+    games_played = excluded.games_played,
+    wins = excluded.wins,
+    words_submitted = excluded.words_submitted,
+    total_response_time = excluded.total_response_time,
+    timed_words = excluded.timed_words,
+    longest_word = excluded.longest_word
+"""
+
+_FIELDS = ("games_played", "wins", "words_submitted", "total_response_time", "timed_words", "longest_word")
+
+
+def _empty_stats() -> dict:
+    return {
+        "games_played": 0,
+        "wins": 0,
+        "words_submitted": 0,
+        "total_response_time": 0.0,
+        "timed_words": 0,
+        "longest_word": ""
+    }
+
+
+def is_tracked_name(name) -> bool:
+    return isinstance(name, str) and name.strip().lower() not in UNTRACKED_NAMES
+
+
+def _ranking_key(name: str, stats: dict) -> tuple:
+    return (-stats["wins"], name)
+
+
+class PlayerStatsStore:
+    """
+    Per-player statistics aggregated in memory from GameManager events.
+
+    Changed rows are flushed to SQLite in a single transaction every
+    flush_interval seconds by a background thread. The leaderboard is kept as a
+    cached top-K list that is only touched when a player's wins change.
+
+    Players are identified by their display name only (there are no accounts), so
+    the default names are left out: every "Anonymous" would share one record.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 5.0, top_k: int = LEADERBOARD_SIZE):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.top_k = top_k
+        self.stats: dict[str, dict] = {}
+        self._dirty: set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._leaderboard: list[str] = []
+        # Jogadores humanos de cada partida em andamento (game_id -> {id: nome}); bots ficam fora das estatísticas
+        self._games: dict[str, dict[str, str]] = {}
+        self._thread = None
+
+        if db_path:
+            self._load()
+            self._thread = threading.Thread(target=self._run, name="player-stats-writer", daemon=True)
+            self._thread.start()
+
+        self._rebuild_leaderboard()
+
+    def record(self, game_id: str, event_type: str, data: dict):
+        """Update the aggregates from a GameManager event."""
+        if event_type == "game_started":
+            self._games[game_id] = {p["id"]: p["name"] for p in data["turn_order"]
+                                    if not p.get("bot") and is_tracked_name(p["name"])}
+
+        elif event_type == "word_submitted":
+            humans = self._games.get(game_id)
+            if not data["accepted"] or not is_tracked_name(data["player"]) or (
+                    humans is not None and data["player_id"] not in humans):
+                return
+            with self._update(data["player"]) as stats:
+                stats["words_submitted"] += 1
+                if data.get("response_time") is not None:
+                    stats["total_response_time"] += data["response_time"]
+                    stats["timed_words"] += 1
+                if len(data["word"]) > len(stats["longest_word"]):
+                    stats["longest_word"] = data["word"]
+
+        elif event_type == "victory":
+            # Fim da partida: conta para todos que começaram, eliminados ou não (nos modos
+            # points e speed ninguém é eliminado)
+            humans = self._games.pop(game_id, {})
+            for name in humans.values():
+                with self._update(name) as stats:
+                    stats["games_played"] += 1
+            if data.get("winner_id") in humans:
+                with self._update(data["winner"]) as stats:
+                    stats["wins"] += 1
+                self._update_leaderboard(data["winner"])
+
+        elif event_type == "room_closed":
+            self._games.pop(game_id, None)
+
+    def get_player_stats(self, name: str) -> Optional[dict]:
+        """Return the public statistics of a player, or None if unknown."""
+        stats = self.stats.get(name)
+        if not stats:
+            return None
+        return self._public_stats(name, stats)
+
+    def get_leaderboard(self, limit: int = 10) -> list[dict]:
+        """Return the top players by wins, served from the cached top-K list."""
+        return [self._public_stats(name, self.stats[name]) for name in self._leaderboard[:limit]]
+
+    def flush(self):
+        """Write every changed row to SQLite in one transaction."""
+        if not self.db_path:
+            return
+        with self._lock:
+            rows = [(name, *(self.stats[name][f] for f in _FIELDS)) for name in self._dirty]
+            self._dirty.clear()
+        if not rows:
+            return
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany(_UPSERT, rows)
+        except sqlite3.Error:
+            # Mantém as linhas pendentes para a próxima tentativa
+            with self._lock:
+                self._dirty.update(row[0] for row in rows)
+            raise
+        finally:
+            conn.close()
+
+    def close(self):
+        """Stop the writer thread and flush pending changes."""
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    @contextmanager
+    def _update(self, name: str) -> Iterator[dict]:
+        """Change a player's counters and mark them dirty under the lock, so a flush never sees half of it."""
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = _empty_stats()
+            yield stats
+            self._dirty.add(name)
+
+    def _public_stats(self, name: str, stats: dict) -> dict:
+        timed = stats["timed_words"]
+        return {
+            "name": name,
+            "games_played": stats["games_played"],
+            "wins": stats["wins"],
+            "words_submitted": stats["words_submitted"],
+            "average_response_time": round(stats["total_response_time"] / timed, 2) if timed else None,
+            "longest_word": stats["longest_word"]
+        }
+
+    def _update_leaderboard(self, name: str):
+        """Reposition one player in the top-K list after their wins changed."""
+        if name in self._leaderboard:
+            self._leaderboard.remove(name)
+        elif len(self._leaderboard) >= self.top_k:
+            last = self._leaderboard[-1]
+            if _ranking_key(name, self.stats[name]) >= _ranking_key(last, self.stats[last]):
+                return
+            self._leaderboard.pop()
+
+        self._leaderboard.append(name)
+        self._leaderboard.sort(key=lambda n: _ranking_key(n, self.stats[n]))
+
+    def _rebuild_leaderboard(self):
+        ranked = sorted(self.stats, key=lambda n: _ranking_key(n, self.stats[n]))
+        self._leaderboard = ranked[:self.top_k]
+
+    def _load(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute(_SCHEMA)
+            for row in conn.execute("SELECT name, " + ", ".join(_FIELDS) + " FROM player_stats"):
+                self.stats[row[0]] = dict(zip(_FIELDS, row[1:]))
+        finally:
+            conn.close()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to flush player stats: {e}")
+
+
+def create_player_stats_from_env() -> PlayerStatsStore:
+    """Creates the stats store, persisting to STATS_DB_PATH when it is set."""
+    return PlayerStatsStore(
+        db_path=os.getenv("STATS_DB_PATH"),
+        flush_interval=float(os.getenv("STATS_FLUSH_INTERVAL", "5.0"))
+    )
@@ -0,0 +1,95 @@
+from typing import Optional
+
+from sortedcontainers import SortedList
+
+ROOM_STATES = ("waiting", "playing", "victory")
+_EMPTY = SortedList()
+
+
+class RoomIndex:
+    """
+    Secondary indexes over the GameEngine rooms, kept current from room events.
+
+    - rooms by state and by difficulty (sets)
+    - joinable rooms (waiting, with open seats, not part of a tournament) as sorted lists of
+      (-players, game_id), globally and per difficulty; the fullest joinable
+      room is always the first entry, so quick match never scans the rooms.
+
+    The sorted lists are SortedList, so a room change costs O(log n) even with
+    tens of thousands of rooms (a plain list would shift the whole tail).
+    """
+
+    def __init__(self):
+        self.rooms: dict[str, dict] = {}
+        self.by_state: dict[str, set[str]] = {state: set() for state in ROOM_STATES}
+        self.by_difficulty: dict[str, set[str]] = {}
+        self._joinable = SortedList()
+        self._joinable_by_difficulty: dict[str, SortedList] = {}
+
+    def record(self, game_id: str, event_type: str, data: dict):
+        """GameEngine event sink."""
+        if event_type == "room_updated":
+            self.update(game_id, data)
+        elif event_type == "room_closed":
+            self.remove(game_id)
+
+    def update(self, game_id: str, summary: dict):
+        """Insert or refresh the indexed summary of a room."""
+        self.remove(game_id)
+        summary = dict(summary, game_id=game_id)
+        self.rooms[game_id] = summary
+        self.by_state.setdefault(summary["game_state"], set()).add(game_id)
+        self.by_difficulty.setdefault(summary["difficulty"], set()).add(game_id)
+
+        if self._is_joinable(summary):
+            key = (-summary["players"], game_id)
+            self._joinable.add(key)
+            self._joinable_by_difficulty.setdefault(summary["difficulty"], SortedList()).add(key)
+
+    def remove(self, game_id: str):
+        """Drop a room from every index."""
+        summary = self.rooms.pop(game_id, None)
+        if not summary:
+            return
+        self.by_state[summary["game_state"]].discard(game_id)
+        self.by_difficulty[summary["difficulty"]].discard(game_id)
+
+        if self._is_joinable(summary):
+            key = (-summary["players"], game_id)
+            self._joinable.discard(key)
+            self._joinable_by_difficulty[summary["difficulty"]].discard(key)
+
+    def list_joinable(self, difficulty: Optional[str] = None, cursor: Optional[list] = None, limit: int = 20) -> tuple[list[dict], Optional[list]]:
+        """
+        Return one page of joinable rooms, fullest first, and the cursor of the next page.
+        The cursor is the sort key of the last room returned; a malformed cursor
+        (it comes from the client) restarts at the first page.
+        """
+        keys = self._keys(difficulty)
+        start = keys.bisect_right(tuple(cursor)) if self._valid_cursor(cursor) else 0
+        page = list(keys.islice(start, start + limit))
+        next_cursor = list(page[-1]) if start + limit < len(keys) and page else None
+        return [self.rooms[game_id] for _, game_id in page], next_cursor
+
+    def best_room(self, difficulty: Optional[str] = None) -> Optional[str]:
+        """Return the waiting room with the most players that still has a free seat."""
+        keys = self._keys(difficulty)
+        return keys[0][1] if keys else None
+
+    def count(self, state: str) -> int:
+        return len(self.by_state.get(state, ()))
+
+    def _keys(self, difficulty: Optional[str]) -> SortedList:
+        if difficulty:
+            return self._joinable_by_difficulty.get(difficulty, _EMPTY)
+        return self._joinable
+
+    @staticmethod
+    def _valid_cursor(cursor) -> bool:
+        return (isinstance(cursor, (list, tuple)) and len(cursor) == 2
+                and type(cursor[0]) is int and isinstance(cursor[1], str))
+
+    @staticmethod
+    def _is_joinable(summary: dict) -> bool:
+        return (summary["game_state"] == "waiting" and summary["players"] < summary["max_players"]
+                and not summary.get("tournament"))
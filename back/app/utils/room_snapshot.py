@@ -0,0 +1,73 @@
+import json
+import time
+import zlib
+from collections import Counter
+from itertools import chain
+
+from app.classes.bot import BotPlayer
+from app.classes.player import Player
+from app.utils.ngram_index import word_grams
+
+SNAPSHOT_VERSION = 2
+
+# Campos da sala copiados como estão; dicionário, timer e jogadores são tratados à parte
+_PLAIN_FIELDS = (
+    "current_word", "game_state", "round_number", "difficulty", "language", "current_player_index",
+    "turn_order", "remaining_time", "mode", "turns_taken", "round_open", "next_letter",
+    "next_letter_index", "settings", "winner", "tournament_id"
+)
+
+
+def snapshot_room(game_id: str, room: dict, timer_running: bool, rejoin_secrets: dict) -> dict:
+    """Plain-data copy of a room, enough for another worker to resume it."""
+    snapshot = {field: room[field] for field in _PLAIN_FIELDS if field in room}
+    snapshot.update({
+        "version": SNAPSHOT_VERSION,
+        "game_id": game_id,
+        # Jogador: [id, nome, sid, host, ativo, pontos, skill do bot (None para humanos)]
+        "players": [[p.id, p.name, p.websocket, p.is_host, p.is_active, p.score, getattr(p, "skill", None)]
+                    for p in room["players"]],
+        "used_words": sorted(room["used_words"]),
+        "timer_running": timer_running,
+        # player_id -> segredo exigido no rejoin_game
+        "rejoin_secrets": rejoin_secrets,
+        # Relógio de parede: mede a pausa da sala entre o snapshot e a retomada no outro worker
+        "taken_at": time.time()
+    })
+    return snapshot
+
+
+def restore_fields(snapshot: dict) -> dict:
+    return {field: snapshot[field] for field in _PLAIN_FIELDS if field in snapshot}
+
+
+def restore_players(snapshot: dict) -> list[Player]:
+    players = []
+    for player_id, name, sid, is_host, is_active, score, skill in snapshot["players"]:
+        player = BotPlayer(name, skill) if skill else Player(name, sid, is_host)
+        player.id = player_id
+        player.websocket = sid
+        player.is_host = is_host
+        player.is_active = is_active
+        player.score = score
+        players.append(player)
+    return players
+
+
+def restore_used(snapshot: dict) -> tuple[set[str], Counter]:
+    """Used words, plus their fragments when the room plays the fragment difficulty."""
+    used_words = set(snapshot["used_words"])
+    used_grams = Counter()
+    if snapshot.get("difficulty") == "fragment":
+        used_grams.update(chain.from_iterable(word_grams(word) for word in used_words))
+    return used_words, used_grams
+
+
+def encode_snapshots(snapshots: list[dict]) -> bytes:
+    """Compact wire format: zlib-compressed JSON list."""
+    return zlib.compress(json.dumps(snapshots, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 6)
+
+
+def decode_snapshots(blob: bytes) -> list[dict]:
+    snapshots = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return [s for s in snapshots if s.get("version") == SNAPSHOT_VERSION]
\ No newline at end of file
@@ -0,0 +1,56 @@
+import math
+from collections import Counter
+from typing import Iterable, Optional
+
+from app.utils.text import strip_accents
+
+# Pontos por letra variam de 1 (letras mais comuns) até MAX_LETTER_POINTS (mais raras)
+MAX_LETTER_POINTS = 10
+ACCENT_BONUS = 2
+# Fração máxima da pontuação da palavra dada como bônus por responder rápido
+SPEED_BONUS = 0.5
+
+
+def compute_letter_points(words: Iterable[str]) -> dict[str, int]:
+    """Points per letter from its frequency in the dictionary: each halving of frequency is worth one more point."""
+    counts = Counter()
+    for word in words:
+        counts.update(strip_accents(word))
+    letters = {c: n for c, n in counts.items() if c.isalpha()}
+    if not letters:
+        return {}
+    most_common = max(letters.values())
+    return {c: min(MAX_LETTER_POINTS, 1 + int(math.log2(most_common / n))) for c, n in letters.items()}
+
+
+class ScoreTable:
+    """
+    Base score of every word of a dictionary: letter points (so longer and rarer
+    words are worth more) plus a bonus per accented letter.
+
+    Scores are computed once per dictionary version, so scoring an accepted word
+    is a single dict lookup. With precompute=False (huge SQLite lexicons) only the
+    letter table is kept and scores are computed per word.
+    """
+
+    def __init__(self, words: Iterable[str], precompute: bool = True):
+        self.letter_points = compute_letter_points(words)
+        self.scores: dict[str, int] = {word: self.compute(word) for word in words} if precompute else {}
+
+    def compute(self, word: str) -> int:
+        plain = strip_accents(word)
+        points = self.letter_points
+        accents = sum(1 for a, b in zip(word, plain) if a != b)
+        return sum(points.get(c, 1) for c in plain if c.isalpha()) + ACCENT_BONUS * accents
+
+    def score(self, word: str) -> int:
+        score = self.scores.get(word)
+        return score if score is not None else self.compute(word)
+
+
+def speed_bonus(base: int, response_time: Optional[float], turn_time: float) -> int:
+    """Extra points proportional to the share of the turn time left when the word was sent."""
+    if response_time is None or turn_time <= 0:
+        return 0
+    remaining = max(0.0, 1 - response_time / turn_time)
+    return round(base * SPEED_BONUS * remaining)
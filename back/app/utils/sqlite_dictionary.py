@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import os
+import pathlib
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from app.utils.dictionary_shards import DictionaryShards
+from app.utils.ngram_index import NgramIndex
+from app.utils.scoring import ScoreTable
+from app.utils.suggestions import SuggestionIndex
+from app.utils.text import strip_accents
+from app.utils.word_index import WordIndex
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 4
+CACHE_SIZE = 50_000
+INSERT_BATCH = 10_000
+
+_SCHEMA = """
+CREATE TABLE words (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL UNIQUE,
+    plain TEXT NOT NULL
+);
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_EXACT = "SELECT word FROM words WHERE word = ?"
+# Palavra digitada sem acento: a forma acentuada (em ordem alfabética, como no
+# índice de normalização) e, se não houver, a própria forma sem acento
+_NORMALIZED = """
+SELECT word FROM words WHERE plain = ?
+ORDER BY word = plain, word
+LIMIT 1
+"""
+
+# Marca de "palavra inexistente" no cache (None significa "não está no cache")
+_MISS = ""
+
+
+def _close_pool(pool: queue.SimpleQueue):
+    while True:
+        try:
+            pool.get_nowait().close()
+        except queue.Empty:
+            return
+
+
+def build_sqlite_dictionary(source: pathlib.Path, db_path: pathlib.Path) -> int:
+    """
+    Streams a one-word-per-line file into an indexed SQLite file and returns the word count.
+    The file is written next to the target and renamed, so readers never see a partial build.
+    """
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        with source.open(encoding="utf-8") as f:
+            batch = []
+            for line in f:
+                word = line.strip().lower()
+                if not word:
+                    continue
+                batch.append((word, strip_accents(word)))
+                if len(batch) >= INSERT_BATCH:
+                    conn.executemany("INSERT OR IGNORE INTO words (word, plain) VALUES (?, ?)", batch)
+                    batch.clear()
+            conn.executemany("INSERT OR IGNORE INTO words (word, plain) VALUES (?, ?)", batch)
+        # O índice é criado depois da carga, que fica bem mais rápida assim
+        conn.execute("CREATE INDEX words_plain ON words (plain)")
+        count = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+        conn.execute("INSERT INTO meta VALUES ('source_mtime', ?)", (repr(source.stat().st_mtime),))
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return count
+
+
+def source_mtime(db_path: pathlib.Path) -> Optional[float]:
+    """Modification time of the word list a SQLite dictionary was built from."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'source_mtime'").fetchone()
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    return float(row[0]) if row else None
+
+
+class SqliteWords:
+    """
+    Read-only, re-iterable view of the words stored in a SqliteDictionary.
+    Lets WordIndex and SuggestionIndex be built by streaming rows instead of
+    keeping a set of every word in memory.
+    """
+
+    def __init__(self, dictionary: "SqliteDictionary"):
+        self._dictionary = dictionary
+
+    def __len__(self) -> int:
+        return self._dictionary.count
+
+    def __bool__(self) -> bool:
+        return self._dictionary.count > 0
+
+    def __contains__(self, word: str) -> bool:
+        # Sem isso o "in" cairia no __iter__ (varredura da tabela); consultas passam por resolve_async
+        raise TypeError("SqliteWords does not support 'in': use SqliteDictionary.resolve_async")
+
+    def __iter__(self) -> Iterator[str]:
+        # Conexão própria: a iteração pode ser longa e não deve segurar uma do pool
+        conn = sqlite3.connect(f"file:{self._dictionary.path}?mode=ro", uri=True)
+        try:
+            for (word,) in conn.execute("SELECT word FROM words"):
+                yield word
+        finally:
+            conn.close()
+
+
+class SqliteDictionary:
+    """
+    Dictionary backed by an indexed SQLite file, for word lists too big to keep as sets.
+
+    Lookups go through a small pool of read-only connections and a bounded LRU
+    of recent results (misses included). resolve_async() answers cache hits on
+    the spot and runs misses in a worker thread, keeping the event loop free.
+    Exposes the same interface as Dictionary.
+
+    The pooled connections are closed by close(), or as soon as the version is
+    dropped (replaced by a reload or evicted, and no longer pinned by any room).
+    """
+
+    def __init__(self, language: str, list_name: str, path: pathlib.Path, version: int = 1,
+                 mtime: Optional[float] = None, pool_size: int = POOL_SIZE, cache_size: int = CACHE_SIZE):
+        self.language = language
+        self.list_name = list_name
+        self.path = path
+        self.version = version
+        self.mtime = mtime
+        self.content_hash: Optional[str] = None
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pool: queue.SimpleQueue = queue.SimpleQueue()
+        for _ in range(pool_size):
+            self._pool.put(sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False))
+        self._finalizer = weakref.finalize(self, _close_pool, self._pool)
+        self.count = self._query("SELECT MAX(id) FROM words")[0] or 0
+        self.words = SqliteWords(self)
+        # Sem índice de normalização em memória: a coluna "plain" faz esse papel
+        self.normalization_index = {}
+        self._word_index = None
+        self._suggestions = None
+        self._ngram_index = None
+        self._score_table = None
+        self._shards = None
+        self._lock = threading.Lock()
+        self.base_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.language}/{self.list_name}"
+
+    def _query(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        conn = self._pool.get()
+        try:
+            return conn.execute(sql, params).fetchone()
+        finally:
+            self._pool.put(conn)
+
+    def _cached(self, word: str) -> Optional[str]:
+        with self._cache_lock:
+            result = self._cache.get(word)
+            if result is not None:
+                self._cache.move_to_end(word)
+                self.hits += 1
+            return result
+
+    def _lookup(self, word: str) -> Optional[str]:
+        # A busca exata (índice UNIQUE) resolve o caso comum com uma consulta só
+        row = self._query(_EXACT, (word,)) or self._query(_NORMALIZED, (strip_accents(word),))
+        result = row[0] if row else _MISS
+        with self._cache_lock:
+            self.misses += 1
+            self._cache[word] = result
+            # A forma do dicionário também: quem resolve "cafe" valida "café" em seguida
+            if result and result != word:
+                self._cache[result] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result or None
+
+    def resolve(self, word: str) -> Optional[str]:
+        """
+        Returns the dictionary form of a submitted word, or None if it does not exist.
+        Blocks on SQLite when the word is not cached; prefer resolve_async on the event loop.
+        """
+        word = word.lower().strip()
+        cached = self._cached(word)
+        if cached is not None:
+            return cached or None
+        return self._lookup(word)
+
+    async def resolve_async(self, word: str) -> Optional[str]:
+        word = word.lower().strip()
+        cached = self._cached(word)
+        if cached is not None:
+            return cached or None
+        return await asyncio.to_thread(self._lookup, word)
+
+    def close(self):
+        """Close the pooled connections (shutdown)."""
+        self._finalizer()
+
+    def random_word(self) -> str:
+        if not self.count:
+            return "casa"
+        # Os ids são densos (1..count) porque o arquivo é sempre gerado do zero
+        row = self._query("SELECT word FROM words WHERE id = ?", (random.randint(1, self.count),))
+        return row[0] if row else "casa"
+
+    @property
+    def word_index(self) -> WordIndex:
+        if self._word_index is None:
+            with self._lock:
+                if self._word_index is None:
+                    self._word_index = WordIndex(self.words)
+        return self._word_index
+
+    @property
+    def suggestions(self) -> SuggestionIndex:
+        if self._suggestions is None:
+            with self._lock:
+                if self._suggestions is None:
+                    self._suggestions = SuggestionIndex(self.words)
+        return self._suggestions
+
+    @property
+    def ngram_index(self) -> NgramIndex:
+        if self._ngram_index is None:
+            with self._lock:
+                if self._ngram_index is None:
+                    self._ngram_index = NgramIndex(self.words)
+        return self._ngram_index
+
+    @property
+    def score_table(self) -> ScoreTable:
+        if self._score_table is None:
+            with self._lock:
+                if self._score_table is None:
+                    # Só a tabela de pontos por letra: um dict com todas as palavras anularia o backend
+                    self._score_table = ScoreTable(self.words, precompute=False)
+        return self._score_table
+
+    @property
+    def shards(self) -> DictionaryShards:
+        if self._shards is None:
+            with self._lock:
+                if self._shards is None:
+                    self._shards = DictionaryShards(self.words)
+        return self._shards
+
+    def size_bytes(self) -> int:
+        """Approximate memory held in this process: the LRU plus derived indexes built so far."""
+        with self._cache_lock:
+            size = sys.getsizeof(self._cache) + sum(sys.getsizeof(k) + 50 for k in self._cache)
+        if self._word_index is not None:
+            size += self.count * 60
+        if self._suggestions is not None:
+            size += self._suggestions.memory_report()["bytes"]
+        if self._ngram_index is not None:
+            size += len(self._ngram_index.counts) * 100
+        if self._score_table is not None:
+            size += sys.getsizeof(self._score_table.scores)
+        if self._shards is not None:
+            size += self._shards.size_bytes()
+        return size
+
+    def cache_stats(self) -> dict:
+        with self._cache_lock:
+            total = self.hits + self.misses
+            return {
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+
+def open_sqlite_dictionary(language: str, list_name: str, source: pathlib.Path,
+                           version: int = 1) -> Optional[SqliteDictionary]:
+    """
+    Opens the SQLite file kept next to a word list, (re)building it first when it is
+    missing or older than the list. A .sqlite file without its .txt is used as is.
+    Returns None when neither file exists.
+    """
+    db_path = source.with_suffix(".sqlite")
+    mtime = source.stat().st_mtime if source.exists() else None
+    if mtime is not None and (not db_path.exists() or source_mtime(db_path) != mtime):
+        started = time.perf_counter()
+        count = build_sqlite_dictionary(source, db_path)
+        logger.info("📚 Built %s: %d words in %.0fms", db_path.name, count, (time.perf_counter() - started) * 1000)
+    if not db_path.exists():
+        return None
+    return SqliteDictionary(language, list_name, db_path, version, mtime)
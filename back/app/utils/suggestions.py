@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SUGGESTION_LIMIT = 3
+MAX_DISTANCE = 2
+# Só os primeiros caracteres após a letra inicial geram chaves (técnica de prefixo do SymSpell).
+# Não perde sugestões a distância 1: uma diferença depois do prefixo cai na chave do prefixo
+# inteiro, e uma dentro dele desloca o resto, que o corte iguala. Palavras longas só trazem
+# mais candidatos para o edit_distance; as de distância 2 já eram cobertas só em parte.
+PREFIX_LENGTH = 10
+
+
+def edit_distance(a: str, b: str, max_distance: int = MAX_DISTANCE) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions).
+    Returns max_distance + 1 as soon as the distance is known to be larger.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    # Prefixo e sufixo comuns não alteram a distância; descartá-los encurta a tabela
+    start = 0
+    limit = min(len(a), len(b))
+    while start < limit and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return min(max(len(a), len(b)), max_distance + 1)
+
+    too_far = max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        # Só as células a até max_distance da diagonal podem ficar dentro do limite
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        if low == 1:
+            current[0] = i
+        char_a = a[i - 1]
+        for j in range(low, high + 1):
+            cost = 0 if char_a == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+        if min(current[low:high + 1]) > max_distance:
+            return too_far
+        previous_previous, previous = previous, current
+    return min(previous[-1], too_far)
+
+
+def _deletes(tail: str) -> set[str]:
+    """The tail prefix itself plus every string obtained by deleting one of its characters."""
+    tail = tail[:PREFIX_LENGTH]
+    return {tail} | {tail[:i] + tail[i + 1:] for i in range(len(tail))}
+
+
+class SuggestionIndex:
+    """
+    Symmetric-delete (SymSpell-style) index for "did you mean" suggestions.
+
+    Words are bucketed by first letter, and each bucket maps the single-character
+    deletes of the next PREFIX_LENGTH characters to the words that produce them
+    (a plain string for one word, a tuple for several, to keep it compact). Two strings
+    share a key when they are one insertion, deletion, substitution or adjacent
+    transposition apart (and for many distance-2 pairs); candidates are then
+    checked with edit_distance. Words longer than the prefix keep full distance-1
+    recall (see PREFIX_LENGTH). Buckets are built on first use; a letter whose
+    bucket did not fit in the memory budget is dropped and stays in skipped.
+    """
+
+    def __init__(self, words: set[str]):
+        self.words = words
+        self.buckets: dict[str, dict] = {}
+        self.skipped: set[str] = set()
+        self._sizes: dict[str, int] = {}
+        self._builds: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def is_built(self, letter: str) -> bool:
+        return letter in self.buckets
+
+    def is_settled(self, letter: str) -> bool:
+        """True when suggest() needs no build for this letter (built, or skipped)."""
+        return letter in self.buckets or letter in self.skipped
+
+    async def ensure_built(self, letter: str, build: Callable[[str], None]):
+        """
+        Run build(letter) in a worker thread unless the letter is settled;
+        concurrent callers wait on the same build.
+        """
+        if self.is_settled(letter):
+            return
+        pending = self._builds.get(letter)
+        if pending is None:
+            pending = self._builds[letter] = asyncio.ensure_future(asyncio.to_thread(build, letter))
+            pending.add_done_callback(lambda _: self._builds.pop(letter, None))
+        await asyncio.shield(pending)
+
+    def drop_bucket(self, letter: str):
+        with self._lock:
+            self.buckets.pop(letter, None)
+            self._sizes.pop(letter, None)
+            self.skipped.add(letter)
+
+    def build_bucket(self, letter: str):
+        """Build the delete map for one starting letter (safe to call from a thread)."""
+        with self._lock:
+            if letter in self.buckets:
+                return
+            started = time.perf_counter()
+            bucket: dict[str, list[str]] = {}
+            for word in self.words:
+                if word[0] != letter:
+                    continue
+                for key in _deletes(word[1:]):
+                    bucket.setdefault(key, []).append(word)
+            compact = {key: words[0] if len(words) == 1 else tuple(words) for key, words in bucket.items()}
+            self._sizes[letter] = sys.getsizeof(compact) + sum(
+                sys.getsizeof(k) + (0 if isinstance(v, str) else sys.getsizeof(v)) for k, v in compact.items()
+            )
+            self.buckets[letter] = bucket = compact
+
+        logger.info("💡 Suggestion bucket '%s': %d keys, ~%.1f MB, built in %.0fms",
+                    letter, len(bucket), self.bucket_size_bytes(letter) / 1e6,
+                    (time.perf_counter() - started) * 1000)
+
+    def suggest(self, word: str, limit: int = SUGGESTION_LIMIT, exclude: set[str] = frozenset()) -> list[str]:
+        """Return up to limit dictionary words close to word, with the same first letter."""
+        if not word:
+            return []
+        bucket = self.buckets.get(word[0])
+        if bucket is None:
+            return []
+
+        tail = word[1:]
+        candidates = set()
+        for key in _deletes(tail):
+            found = bucket.get(key)
+            if isinstance(found, str):
+                candidates.add(found)
+            elif found:
+                candidates.update(found)
+
+        # Candidatos de tamanho parecido primeiro; quando já há limit resultados a
+        # distância 1, os demais só precisam ser testados com esse limite (mais barato)
+        threshold = MAX_DISTANCE
+        close_matches = 0
+        scored = []
+        for candidate in sorted(candidates, key=lambda c: abs(len(c) - len(word))):
+            if candidate == word or candidate in exclude:
+                continue
+            distance = edit_distance(tail, candidate[1:], threshold)
+            if distance > threshold:
+                continue
+            scored.append((distance, abs(len(candidate) - len(word)), candidate))
+            if distance < MAX_DISTANCE:
+                close_matches += 1
+                if close_matches >= limit:
+                    threshold = MAX_DISTANCE - 1
+        scored.sort()
+        return [candidate for _, _, candidate in scored[:limit]]
+
+    def bucket_size_bytes(self, letter: str) -> int:
+        """Approximate memory held by one bucket (dict, keys and tuples; the words are shared), measured when built."""
+        return self._sizes.get(letter, 0)
+
+    def memory_report(self) -> dict:
+        """Memory footprint of the buckets built so far."""
+        sizes = dict(self._sizes)
+        return {
+            "letters_built": sorted(sizes),
+            "keys": sum(len(b) for b in list(self.buckets.values())),
+            "bytes": sum(sizes.values())
+        }
+
+
+async def get_suggestions(word: str, index: SuggestionIndex, build: Callable[[str], None],
+                          limit: int = SUGGESTION_LIMIT, exclude: Optional[set[str]] = None) -> list[str]:
+    """Suggestions for a rejected word. The first use of a letter builds its bucket (see ensure_built)."""
+    word = word.lower().strip()
+    if not word:
+        return []
+    await index.ensure_built(word[0], build)
+    return index.suggest(word, limit, exclude or frozenset())
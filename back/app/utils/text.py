@@ -0,0 +1,15 @@
+# Tabela de tradução para remover acentos: letras acentuadas viram a letra base
+# e marcas combinantes (texto em NFD) são descartadas
+_ACCENT_TABLE = str.maketrans(
+    "áàâãäéèêëíìîïóòôõöúùûüçñ",
+    "aaaaaeeeeiiiiooooouuuucn",
+    "".join(chr(c) for c in range(0x300, 0x370))
+)
+
+def strip_accents(word: str) -> str:
+    """
+    Removes accents from a lowercase word using a precomputed translation table.
+    """
+    if word.isascii():
+        return word
+    return word.translate(_ACCENT_TABLE)
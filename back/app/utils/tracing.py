@@ -0,0 +1,278 @@
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Coroutine, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Span ativo da tarefa atual; cada tarefa asyncio tem sua própria cópia do contexto
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+_STOP = object()
+
+
+class Span:
+    """One timed operation of a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_us": (self.end_ns - self.start_ns) // 1000,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """
+    Sampled tracing with spans carried in a context variable.
+
+    trace() opens the root span of a Socket.IO event; only sample_rate of them
+    are recorded. span() nests under the active span and is a no-op when the
+    current event is not sampled, so unsampled events cost one lookup per span.
+    Finished spans go to the exporter, which batches them off the event loop.
+    """
+
+    def __init__(self, exporter: "BatchSpanExporter" = None, sample_rate: float = 0.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def configure(self, exporter: Optional["BatchSpanExporter"], sample_rate: float):
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter else 0.0
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            yield None
+            return
+        with self._record(Span(name, f"{random.getrandbits(128):032x}", None, attributes)) as span:
+            yield span
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        with self._record(Span(name, parent.trace_id, parent.span_id, attributes)) as span:
+            yield span
+
+    @contextmanager
+    def activate(self, span: Optional[Span]) -> Iterator[Optional[Span]]:
+        """Make span the active one (to continue a trace in another task)."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def _record(self, span: Span) -> Iterator[Span]:
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if self.exporter:
+                self.exporter.export(span)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def traced(name: str):
+    """Decorator recording a span around a function (sync or async) when called inside a sampled trace."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def create_detached_task(coro: Coroutine) -> asyncio.Task:
+    """Start a background task outside the current trace (timers outlive the event that started them)."""
+    context = contextvars.copy_context()
+    context.run(_current_span.set, None)
+    return asyncio.create_task(coro, context=context)
+
+
+class FileSpanWriter:
+    """Appends spans as JSON lines."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, spans: list[Span]):
+        self._file.write("".join(json.dumps(span.to_dict(), separators=(",", ":")) + "\n" for span in spans))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class OTLPSpanWriter:
+    """Posts spans to an OTLP/HTTP collector (JSON encoding of /v1/traces)."""
+
+    def __init__(self, endpoint: str, service_name: str = "word-tower", timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def write(self, spans: list[Span]):
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "word-tower"},
+                    "spans": [{
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()]
+                    } for span in spans]
+                }]
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    def close(self):
+        pass
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class BatchSpanExporter:
+    """
+    Queues finished spans and hands them to a writer in batches from a background thread.
+    When the queue is full (writer too slow or collector down) spans are dropped, never awaited.
+    """
+
+    def __init__(self, writer, export_interval: float = 2.0, max_batch: int = 512, max_queue: int = 8192):
+        self.writer = writer
+        self.export_interval = export_interval
+        self.max_batch = max_batch
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Exports pending spans and stops the exporter thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self.writer.close()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            deadline = time.monotonic() + self.export_interval
+            batch = []
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            if batch:
+                try:
+                    self.writer.write(batch)
+                except Exception as e:
+                    logger.warning(f"Dropped {len(batch)} spans: {e}")
+
+
+tracer = Tracer()
+
+
+def configure_tracing_from_env() -> Optional[BatchSpanExporter]:
+    """Enables tracing if TRACE_EXPORT_PATH or TRACE_OTLP_ENDPOINT is set."""
+    path = os.getenv("TRACE_EXPORT_PATH")
+    endpoint = os.getenv("TRACE_OTLP_ENDPOINT")
+    if endpoint:
+        writer = OTLPSpanWriter(endpoint)
+    elif path:
+        writer = FileSpanWriter(path)
+    else:
+        return None
+    exporter = BatchSpanExporter(writer, export_interval=float(os.getenv("TRACE_EXPORT_INTERVAL", "2.0")))
+    tracer.configure(exporter, float(os.getenv("TRACE_SAMPLE_RATE", "0.01")))
+    return exporter
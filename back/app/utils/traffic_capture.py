@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import secrets
+import time
+from typing import Iterator, Optional
+
+from app.utils.event_log import EventLog
+
+# Eventos que nunca vão para a captura (carregam segredos)
+SKIPPED_EVENTS = {"admin_drain"}
+# Campos com nomes escolhidos pelos jogadores ou que identificam um jogador, trocados por pseudônimos
+PSEUDONYM_FIELDS = {"player_name": "p-", "game_id": "r-", "tournament_id": "t-", "player_id": "id-"}
+# Campos com segredos (ex.: o segredo do rejoin_game), que nunca vão para o disco
+SECRET_FIELDS = {"rejoin_secret", "token"}
+
+
+class TrafficRecorder(EventLog):
+    """
+    Opt-in capture of the inbound Socket.IO traffic, one JSON line per event:
+    {"t": wall time, "conn": "c12", "room": "r-…", "event": "submit_word", "data": {...}}.
+
+    Player, room and tournament names (and player ids) become keyed hashes whose key
+    only lives in this process, so the file keeps who played where and when without
+    the names. Secret fields are dropped.
+    The start of every game is also written (a "seed" line with the initial word
+    and turn order) so a replay can follow the recorded word chain.
+
+    Writing reuses the EventLog writer thread: the event loop only serializes and
+    enqueues.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        super().__init__(path, flush_interval=flush_interval)
+        self._key = secrets.token_bytes(16)
+        self._connections: dict[str, str] = {}
+        self._connection_ids = itertools.count(1)
+
+    def pseudonym(self, prefix: str, value) -> str:
+        digest = hmac.new(self._key, str(value).encode("utf-8"), hashlib.sha256).hexdigest()
+        return prefix + digest[:10]
+
+    def capture(self, sid: str, event: str, data=None, game_id: str = None):
+        """Queues one inbound event of a client."""
+        if self._closed or event in SKIPPED_EVENTS:
+            return
+        connection = self._connections.get(sid)
+        if connection is None:
+            connection = self._connections[sid] = f"c{next(self._connection_ids)}"
+        if event == "disconnect":
+            del self._connections[sid]
+
+        line = {"t": time.time(), "conn": connection, "event": event}
+        if game_id:
+            line["room"] = self.pseudonym("r-", game_id)
+        if isinstance(data, dict):
+            line["data"] = {
+                key: self.pseudonym(PSEUDONYM_FIELDS[key], value) if key in PSEUDONYM_FIELDS and value else value
+                for key, value in data.items() if key not in SECRET_FIELDS
+            }
+        self._write(line)
+
+    def record(self, game_id: str, event_type: str, data: dict):
+        """Event sink: keeps how each game started."""
+        if self._closed or event_type != "game_started":
+            return
+        self._write({
+            "t": time.time(),
+            "room": self.pseudonym("r-", game_id),
+            "seed": {
+                "initial_word": data["initial_word"],
+                "next_letter": data["next_letter"],
+                "turn_order": [self.pseudonym("p-", p["name"]) for p in data["turn_order"]]
+            }
+        })
+
+    def _write(self, line: dict):
+        self._queue.put(json.dumps(line, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+def read_capture(path: str) -> Iterator[dict]:
+    """Yields the captured lines in file order; a truncated last line is ignored."""
+    with open(path, "rb") as f:
+        for raw in f:
+            try:
+                yield json.loads(raw)
+            except ValueError:
+                return
+
+
+def create_traffic_recorder_from_env() -> Optional[TrafficRecorder]:
+    """Creates the recorder if TRAFFIC_CAPTURE_PATH is set."""
+    path = os.getenv("TRAFFIC_CAPTURE_PATH")
+    if not path:
+        return None
+    return TrafficRecorder(path, flush_interval=float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "1.0")))
@@ -0,0 +1,80 @@
+import math
+import random
+from collections import Counter
+from typing import Optional
+
+from app.utils.text import strip_accents
+
+RARITY_TIERS = 3
+RANDOM_PROBES = 8
+
+
+class WordIndex:
+    """
+    Words of one dictionary grouped by first letter and split into rarity tiers.
+
+    Rarity is estimated from the dictionary itself (how uncommon the word's
+    letters are, plus its length), since there is no frequency list. Picking a
+    word probes a few random positions of the tier and only falls back to a
+    scan when almost every word of the tier was already used.
+    """
+
+    def __init__(self, words: set[str]):
+        letter_counts = Counter(char for word in words for char in word)
+        total = sum(letter_counts.values()) or 1
+        letter_cost = {char: -math.log(count / total) for char, count in letter_counts.items()}
+
+        def rarity(word: str) -> float:
+            return sum(letter_cost[char] for char in word) / len(word) + len(word) * 0.15
+
+        by_letter: dict[str, list[str]] = {}
+        for word in words:
+            by_letter.setdefault(word[0], []).append(word)
+
+        self.tiers: dict[str, list[list[str]]] = {}
+        for letter, letter_words in by_letter.items():
+            letter_words.sort(key=rarity)
+            size = math.ceil(len(letter_words) / RARITY_TIERS)
+            self.tiers[letter] = [letter_words[i * size:(i + 1) * size] for i in range(RARITY_TIERS)]
+
+    def pick(self, letter: str, tier: int, used: set[str], rng: random.Random = random) -> Optional[str]:
+        """
+        Return an unused word starting with letter, preferring the given rarity tier.
+        An accented letter ("é") falls back to words starting with its plain form,
+        which the turn rule also accepts.
+        """
+        word = self._pick(letter, tier, used, rng)
+        plain = strip_accents(letter)
+        if word is None and plain != letter:
+            word = self._pick(plain, tier, used, rng)
+        return word
+
+    def _pick(self, letter: str, tier: int, used: set[str], rng) -> Optional[str]:
+        tiers = self.tiers.get(letter)
+        if not tiers:
+            return None
+
+        order = [tier] + [t for t in range(RARITY_TIERS) if t != tier]
+        for t in order:
+            candidates = tiers[t]
+            if not candidates:
+                continue
+            for _ in range(RANDOM_PROBES):
+                word = candidates[rng.randrange(len(candidates))]
+                if word not in used:
+                    return word
+            start = rng.randrange(len(candidates))
+            for i in range(len(candidates)):
+                word = candidates[(start + i) % len(candidates)]
+                if word not in used:
+                    return word
+        return None
+
+    def random_word(self, rng: random.Random = random) -> Optional[str]:
+        """Return any word of the index (used for deliberate mistakes)."""
+        if not self.tiers:
+            return None
+        tiers = self.tiers[rng.choice(list(self.tiers))]
+        candidates = tiers[rng.randrange(RARITY_TIERS)] or tiers[0]
+        return rng.choice(candidates)
+
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import random
+
+from app.classes.bot import BotPlayer, BOT_NAMES
+
+logger = logging.getLogger(__name__)
+
+MAX_BOTS_PER_ROOM = 6
+
+
+class BotManager:
+    """
+    Hosts bot players for GameEngine rooms.
+
+    Bots are idle objects until a turn_started event names one of them; only
+    then a short-lived task waits the bot's think time (on the engine clock)
+    and submits a word through handle_word_submission. Words come from the
+    precomputed WordIndex, so choosing one is a handful of set lookups.
+    """
+
+    def __init__(self, engine, rng: random.Random = None):
+        self.engine = engine
+        self.rng = rng or random.Random()
+        self.bots: dict[str, tuple[str, BotPlayer]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def add_bot(self, game_id: str, skill: str = "medium") -> tuple[bool, str]:
+        """Create a bot and add it to an existing room."""
+        room = self.engine.rooms.get(game_id)
+        if not room:
+            return False, "Room not found"
+        if sum(1 for p in room["players"] if p.is_bot) >= MAX_BOTS_PER_ROOM:
+            return False, f"Maximum of {MAX_BOTS_PER_ROOM} bots per room"
+
+        # Constrói o índice fora do event loop na primeira vez
+        dictionary = await self.engine.acquire_room_dictionary(room)
+        await asyncio.to_thread(lambda: dictionary.word_index)
+
+        taken = {p.name for p in room["players"]}
+        name = next((n for n in BOT_NAMES if f"🤖 {n}" not in taken), f"Bot {len(taken) + 1}")
+        bot = BotPlayer(f"🤖 {name}", skill)
+        self.bots[bot.id] = (game_id, bot)
+        await self.engine.add_player(game_id, bot)
+        return True, "Bot added"
+
+    async def remove_bot(self, game_id: str, bot_id: str) -> tuple[bool, str]:
+        """Remove a bot from its room."""
+        entry = self.bots.pop(bot_id, None)
+        if not entry or entry[0] != game_id:
+            return False, "Bot not found"
+        await self.engine.disconnect(game_id, entry[1].websocket)
+        return True, "Bot removed"
+
+    def record(self, game_id: str, event_type: str, data: dict):
+        """GameEngine event sink: wake a bot when its turn starts."""
+        if event_type == "room_restored":
+            # Sala migrada de outro worker: os bots dela passam a ser hospedados aqui
+            room = self.engine.rooms.get(game_id)
+            for player in room["players"] if room else []:
+                if player.id in data["bot_ids"]:
+                    self.bots[player.id] = (game_id, player)
+            return
+        if event_type == "room_closed":
+            for bot_id in [b for b, (g, _) in self.bots.items() if g == game_id]:
+                del self.bots[bot_id]
+            return
+        if event_type != "turn_started":
+            return
+        if data["player_id"] is None:
+            # Rodada do modo speed: todos os bots ativos da sala disputam
+            room = self.engine.rooms.get(game_id)
+            for player in room["players"] if room else []:
+                if player.is_bot and player.is_active and player.id in self.bots:
+                    self._spawn(game_id, self.bots[player.id][1])
+            return
+        entry = self.bots.get(data["player_id"])
+        if not entry:
+            return
+        if game_id not in self.engine.rooms:
+            del self.bots[data["player_id"]]
+            return
+
+        self._spawn(game_id, entry[1])
+
+    def _spawn(self, game_id: str, bot: BotPlayer):
+        # O token é lido junto com o evento: identifica este turno mesmo que outro comece antes da tarefa rodar
+        turn_token = self.engine.rooms[game_id]["turn_token"]
+        task = asyncio.create_task(self._play_turn(game_id, bot, turn_token))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _is_turn_of(self, game_id: str, bot: BotPlayer, turn_token) -> bool:
+        room = self.engine.rooms.get(game_id)
+        if not room or room["game_state"] != "playing" or room["turn_token"] != turn_token:
+            return False
+        if room.get("mode") == "speed":
+            return room.get("round_open", False) and bot.is_active
+        current = self.engine.get_current_player_info(game_id)
+        return bool(current) and current["id"] == bot.id
+
+    async def _play_turn(self, game_id: str, bot: BotPlayer, turn_token: int):
+        settings = bot.settings
+
+        # Repete enquanto a vez for do bot: uma palavra rejeitada mantém o turno
+        while True:
+            await self.engine.clock.sleep(self.rng.uniform(*settings["think_time"]))
+            if not self._is_turn_of(game_id, bot, turn_token):
+                return
+
+            room = self.engine.rooms[game_id]
+            dictionary = self.engine.get_room_dictionary(room)
+            index = dictionary.word_index
+            if self.rng.random() < settings["error_rate"]:
+                word = index.random_word(self.rng)
+            elif room["difficulty"] == "fragment":
+                # A lista de palavras do fragmento pode exigir uma varredura do dicionário
+                word = await asyncio.to_thread(
+                    dictionary.ngram_index.pick, self.engine.get_expected_letter(room), room["used_words"], self.rng
+                )
+                if not self._is_turn_of(game_id, bot, turn_token):
+                    return
+            else:
+                word = index.pick(self.engine.get_expected_letter(room), settings["tier"], room["used_words"], self.rng)
+
+            if not word:
+                logger.info("🤖 %s has no word left for this turn", bot.name)
+                return
+
+            await self.engine.handle_word_submission(game_id, bot.websocket, word)
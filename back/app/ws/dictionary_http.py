@@ -0,0 +1,104 @@
+import asyncio
+import gzip
+import json
+import logging
+from typing import Union
+
+from app.utils.dictionary import DIFFICULTY_LISTS, DictionaryRegistry
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "/dictionary"
+# Shards têm o hash do conteúdo no nome, então podem ficar em cache para sempre
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+class DictionaryHTTPApp:
+    """
+    Plain ASGI app serving dictionary shards so clients can pre-check words locally:
+
+      GET /dictionary/{language}/{difficulty}/manifest.json   -> {"version", "shards": {letter: {path, words, bytes}}}
+      GET /dictionary/{language}/{difficulty}/{letter}.{hash}.txt -> newline-separated words (gzip)
+
+    Socket.IO hands it every HTTP request outside /socket.io.
+    """
+
+    def __init__(self, registry: DictionaryRegistry, cors_allowed: Union[str, list[str]]):
+        self.registry = registry
+        self.cors_allowed = cors_allowed
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        cors = self._cors_headers(headers.get("origin"))
+
+        if scope["method"] == "OPTIONS":
+            await self._send(send, 204, cors + [("access-control-allow-methods", "GET, OPTIONS"),
+                                                ("access-control-max-age", "86400")])
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._send(send, 405, cors + [("allow", "GET, OPTIONS")])
+            return
+
+        parts = scope["path"][len(PREFIX) + 1:].split("/") if scope["path"].startswith(PREFIX + "/") else []
+        if len(parts) != 3 or parts[1].lower() not in DIFFICULTY_LISTS or parts[0] not in self.registry.languages():
+            await self._send(send, 404, cors)
+            return
+        language, difficulty, name = parts
+
+        try:
+            dictionary = await self.registry.acquire(language, difficulty)
+            # A primeira montagem comprime o dicionário inteiro: fora do event loop
+            shards = await asyncio.to_thread(lambda: dictionary.shards)
+        except Exception as e:
+            logger.error(f"Could not build dictionary shards for {language}/{difficulty}: {e}")
+            await self._send(send, 503, cors)
+            return
+
+        if name == "manifest.json":
+            # A versão é o hash do conteúdo: é ela que o ETag carrega, então muda junto com as palavras
+            manifest = {"version": shards.version, "shards": shards.manifest(f"{PREFIX}/{language}/{difficulty}")}
+            body = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+            etag = f'"{shards.version}"'
+            response_headers = cors + [("content-type", "application/json"), ("etag", etag),
+                                       ("cache-control", "no-cache"), ("vary", "Origin")]
+        else:
+            shard = shards.by_filename.get(name)
+            if shard is None:
+                # Versão antiga do dicionário: o cliente deve buscar o manifest de novo
+                await self._send(send, 404, cors)
+                return
+            etag = shard.etag
+            response_headers = cors + [("content-type", "text/plain; charset=utf-8"), ("etag", etag),
+                                       ("cache-control", IMMUTABLE_CACHE), ("vary", "Origin, Accept-Encoding")]
+            if "gzip" in headers.get("accept-encoding", ""):
+                body = shard.gzipped
+                response_headers.append(("content-encoding", "gzip"))
+            else:
+                body = gzip.decompress(shard.gzipped)
+
+        if etag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+            await self._send(send, 304, [h for h in response_headers if h[0] in ("etag", "cache-control", "vary")
+                                         or h[0].startswith("access-control")])
+            return
+        await self._send(send, 200, response_headers, body if scope["method"] == "GET" else b"", len(body))
+
+    def _cors_headers(self, origin: str) -> list[tuple[str, str]]:
+        if self.cors_allowed == "*":
+            allowed = "*"
+        elif origin and origin in self.cors_allowed:
+            allowed = origin
+        else:
+            return []
+        return [("access-control-allow-origin", allowed), ("access-control-expose-headers", "ETag")]
+
+    @staticmethod
+    async def _send(send, status: int, headers: list[tuple[str, str]], body: bytes = b"", length: int = None):
+        headers = headers + [("content-length", str(len(body) if length is None else length))]
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,152 @@
+import asyncio
+import hmac
+import json
+import logging
+import time
+import urllib.request
+from typing import Callable, Optional
+
+from app.utils.room_snapshot import decode_snapshots, encode_snapshots
+
+logger = logging.getLogger(__name__)
+
+IMPORT_PATH = "/internal/rooms"
+TOKEN_HEADER = "x-drain-token"
+# Limite do corpo aceito em IMPORT_PATH (snapshots comprimidos)
+MAX_IMPORT_BYTES = 64 * 1024 * 1024
+
+
+class DrainController:
+    """
+    Moves every room of this worker to a peer before a restart.
+
+    drain() stops new rooms (clients are redirected to the peer), freezes each
+    room through its actor, sends all snapshots in one compressed POST and, for
+    each room the peer accepted, tells its clients to reconnect there. Rooms the
+    peer refused (or all of them, if the peer is unreachable) are unfrozen and
+    keep playing here.
+    """
+
+    def __init__(self, engine, peer_url: str, public_url: str, token: str,
+                 keep_room: Callable[[str], bool] = None, timeout: float = 30.0):
+        self.engine = engine
+        self.peer_url = peer_url.rstrip("/")
+        self.public_url = public_url.rstrip("/")
+        self.token = token
+        self.keep_room = keep_room or (lambda game_id: False)
+        self.timeout = timeout
+        self.draining = False
+
+    async def drain(self) -> Optional[dict]:
+        if self.draining:
+            return None
+        self.draining = True
+        self.engine.drain_redirect = self.public_url
+        logger.info(f"🚚 Draining {len(self.engine.rooms)} room(s) to {self.peer_url}")
+
+        started = time.perf_counter()
+        snapshots = []
+        for game_id in list(self.engine.rooms):
+            if self.keep_room(game_id):
+                logger.info(f"🚚 Room {game_id} belongs to a running tournament and stays here")
+                continue
+            snapshot = await self.engine.export_room(game_id)
+            if snapshot:
+                snapshots.append(snapshot)
+        if not snapshots:
+            return {"migrated": {}, "refused": []}
+
+        blob = encode_snapshots(snapshots)
+        try:
+            result = await asyncio.to_thread(self._send, blob)
+        except Exception as e:
+            logger.error(f"🚚 Peer {self.peer_url} unreachable, rooms stay here: {e}")
+            for snapshot in snapshots:
+                await self.engine.abort_export(snapshot["game_id"])
+            self.engine.drain_redirect = None
+            self.draining = False
+            return None
+
+        accepted = set(result.get("imported", []))
+        handoff_ms = {}
+        for snapshot in snapshots:
+            game_id = snapshot["game_id"]
+            if game_id in accepted:
+                await self.engine.complete_export(game_id, self.public_url)
+                # Do congelamento até os clientes receberem o aviso; a pausa total é registrada pelo peer
+                handoff_ms[game_id] = round((time.time() - snapshot["taken_at"]) * 1000)
+                logger.info(f"🚚 Room {game_id} handed off in {handoff_ms[game_id]}ms")
+            else:
+                logger.warning(f"🚚 Peer refused room {game_id}, it stays here")
+                await self.engine.abort_export(game_id)
+
+        logger.info(f"🚚 Drain finished: {len(accepted)}/{len(snapshots)} room(s) in "
+                    f"{(time.perf_counter() - started) * 1000:.0f}ms, {len(blob)} bytes sent")
+        return {"migrated": handoff_ms, "refused": [s["game_id"] for s in snapshots if s["game_id"] not in accepted]}
+
+    def _send(self, blob: bytes) -> dict:
+        request = urllib.request.Request(
+            self.peer_url + IMPORT_PATH, data=blob, method="POST",
+            headers={"Content-Type": "application/octet-stream", "X-Drain-Token": self.token}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+
+class MigrationHTTPApp:
+    """Receives room snapshots from a draining peer (POST /internal/rooms); other requests go to the next app."""
+
+    def __init__(self, engine, token: str, next_app):
+        self.engine = engine
+        self.token = token
+        self.next_app = next_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != IMPORT_PATH:
+            await self.next_app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        if scope["method"] != "POST":
+            await self._respond(send, 405, {"error": "method not allowed"})
+            return
+        # Sem token configurado a rota fica desligada
+        if not self.token or not hmac.compare_digest(headers.get(TOKEN_HEADER, ""), self.token):
+            await self._respond(send, 403, {"error": "forbidden"})
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > MAX_IMPORT_BYTES:
+                await self._respond(send, 413, {"error": "too large"})
+                return
+            if not message.get("more_body"):
+                break
+
+        try:
+            snapshots = decode_snapshots(bytes(body))
+        except Exception as e:
+            await self._respond(send, 400, {"error": f"invalid snapshot: {e}"})
+            return
+
+        imported = []
+        for snapshot in snapshots:
+            try:
+                if await self.engine.import_room(snapshot):
+                    imported.append(snapshot["game_id"])
+            except Exception:
+                logger.exception(f"🚚 Could not import room {snapshot.get('game_id')}")
+        logger.info(f"🚚 Imported {len(imported)}/{len(snapshots)} room(s) from a draining worker")
+        await self._respond(send, 200, {"imported": imported})
+
+    @staticmethod
+    async def _respond(send, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+        })
+        await send({"type": "http.response.body", "body": body})
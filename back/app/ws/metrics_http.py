@@ -0,0 +1,68 @@
+import heapq
+
+# Salas listadas pelo id no /metrics: só as de fila mais longa, para não criar uma série por sala
+TOP_ROOMS = 10
+
+
+class MetricsHTTPApp:
+    """
+    Serves GET /metrics (Prometheus text format) with the command queues summed over
+    every room (a wait histogram, counters and depth gauges) plus the few rooms with
+    the longest queue right now, and hands any other HTTP request to the next app.
+    """
+
+    def __init__(self, engine, next_app, top_rooms: int = TOP_ROOMS):
+        self.engine = engine
+        self.next_app = next_app
+        self.top_rooms = top_rooms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != "/metrics":
+            await self.next_app(scope, receive, send)
+            return
+
+        body = self.render().encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/plain; version=0.0.4"),
+                        (b"content-length", str(len(body)).encode("latin-1"))]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def render(self) -> str:
+        metrics = self.engine.queue_metrics
+        # Salas fechadas somem daqui junto com a sala, mesmo que o ator ainda esteja drenando
+        depths = [(actor.depth, game_id) for game_id, actor in self.engine.actors.items()
+                  if game_id in self.engine.rooms]
+        lines = [
+            "# TYPE word_tower_rooms gauge",
+            f"word_tower_rooms {len(self.engine.rooms)}",
+            "# TYPE word_tower_room_queued_commands gauge",
+            f"word_tower_room_queued_commands {sum(depth for depth, _ in depths)}",
+            "# TYPE word_tower_room_queue_max_depth gauge",
+            f"word_tower_room_queue_max_depth {max((depth for depth, _ in depths), default=0)}",
+            "# TYPE word_tower_room_commands_total counter",
+            f"word_tower_room_commands_total {metrics.processed}",
+            "# TYPE word_tower_room_commands_rejected_total counter",
+            f"word_tower_room_commands_rejected_total {metrics.rejected}",
+            "# TYPE word_tower_room_command_wait_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(metrics.buckets, metrics.bucket_counts):
+            cumulative += count
+            lines.append(f'word_tower_room_command_wait_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines += [
+            f'word_tower_room_command_wait_seconds_bucket{{le="+Inf"}} {metrics.wait_count}',
+            f"word_tower_room_command_wait_seconds_sum {metrics.wait_sum}",
+            f"word_tower_room_command_wait_seconds_count {metrics.wait_count}",
+            "# TYPE word_tower_room_queue_depth gauge",
+        ]
+        busiest = heapq.nlargest(self.top_rooms, (entry for entry in depths if entry[0]))
+        lines.extend(f'word_tower_room_queue_depth{{room="{_label(game_id)}"}} {depth}' for depth, game_id in busiest)
+        return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    # O id da sala vem do cliente: escapa como exige o formato de texto do Prometheus
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Optional
+
+from app.classes.game_engine import MAX_PLAYERS
+
+logger = logging.getLogger(__name__)
+
+TOURNAMENT_ROOM_SIZE = 6
+ROOM_CREATION_BATCH = 50
+START_WINDOW = 1.0
+
+
+def shard_entrants(entrants: list, room_size: int) -> list[list]:
+    """Split entrants into ceil(n / room_size) rooms whose sizes differ by at most one."""
+    if not entrants:
+        return []
+    room_count = math.ceil(len(entrants) / room_size)
+    base, extra = divmod(len(entrants), room_count)
+
+    rooms = []
+    start = 0
+    for i in range(room_count):
+        size = base + (1 if i < extra else 0)
+        rooms.append(entrants[start:start + size])
+        start += size
+    return rooms
+
+
+class TournamentManager:
+    """
+    Runs elimination tournaments on top of GameManager.
+
+    Each bracket level shards the remaining entrants into rooms, creates them in
+    batches (yielding to the event loop between batches) and spreads the game
+    starts over START_WINDOW seconds so the per-second turn timers of hundreds
+    of rooms don't all fire on the same tick. Victory events from GameManager
+    advance the winners; when every room of a level is decided the next level
+    is created automatically.
+    """
+
+    def __init__(self, manager, sio, room_size: int = TOURNAMENT_ROOM_SIZE,
+                 batch_size: int = ROOM_CREATION_BATCH, start_window: float = START_WINDOW):
+        self.manager = manager
+        self.sio = sio
+        self.room_size = room_size
+        self.batch_size = batch_size
+        self.start_window = start_window
+        self.tournaments: dict[str, dict] = {}
+        self.room_to_tournament: dict[str, str] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def create(self, tournament_id: str, owner_sid: str, room_size: Optional[int] = None) -> tuple[bool, str]:
+        """Create a tournament that accepts registrations until it is started."""
+        if tournament_id in self.tournaments:
+            return False, "Tournament already exists"
+        if room_size is None:
+            room_size = self.room_size
+        else:
+            try:
+                if isinstance(room_size, bool):
+                    raise TypeError(room_size)
+                room_size = int(room_size)
+            except (TypeError, ValueError):
+                return False, f"Room size must be a number between 2 and {MAX_PLAYERS}"
+
+        self.tournaments[tournament_id] = {
+            "id": tournament_id,
+            "owner": owner_sid,
+            "state": "registering",
+            "room_size": min(MAX_PLAYERS, max(2, room_size)),
+            "entrants": {},
+            "level": 0,
+            "rooms": {},
+            "pending_rooms": set(),
+            "advancing": [],
+            "champion": None
+        }
+        return True, "Tournament created"
+
+    async def register(self, tournament_id: str, sid: str, player_name: str) -> tuple[bool, str]:
+        """Register a player in a tournament that has not started yet."""
+        tournament = self.tournaments.get(tournament_id)
+        if not tournament:
+            return False, "Tournament not found"
+        if tournament["state"] != "registering":
+            return False, "Tournament already started"
+
+        tournament["entrants"][sid] = player_name
+        await self.sio.enter_room(sid, self._channel(tournament_id))
+        return True, "Registered"
+
+    async def start(self, tournament_id: str, requesting_sid: str) -> tuple[bool, str]:
+        """Start the first bracket level."""
+        tournament = self.tournaments.get(tournament_id)
+        if not tournament:
+            return False, "Tournament not found"
+        if tournament["owner"] != requesting_sid:
+            return False, "Only the tournament creator can start it"
+        if tournament["state"] != "registering":
+            return False, "Tournament already started"
+        if len(tournament["entrants"]) < 2:
+            return False, "Minimum 2 players required"
+
+        tournament["state"] = "running"
+        entrants = list(tournament["entrants"].items())
+        await self._start_level(tournament, entrants)
+        return True, "Tournament started"
+
+    def record(self, game_id: str, event_type: str, data: dict):
+        """GameManager event sink: collect room winners and advance the bracket."""
+        if event_type != "victory":
+            return
+        tournament_id = self.room_to_tournament.get(game_id)
+        tournament = self.tournaments.get(tournament_id)
+        if not tournament or game_id not in tournament["pending_rooms"]:
+            return
+
+        tournament["pending_rooms"].discard(game_id)
+        room = self.manager.rooms.get(game_id)
+        winner = None
+        if room and data.get("winner_id"):
+            winner = next((p for p in room["players"] if p.id == data["winner_id"]), None)
+        if winner:
+            tournament["advancing"].append((winner.websocket, winner.name))
+
+        if not tournament["pending_rooms"]:
+            self._spawn(self._finish_level(tournament))
+
+    async def _start_level(self, tournament: dict, entrants: list):
+        tournament["level"] += 1
+        tournament["advancing"] = []
+        level = tournament["level"]
+        shards = shard_entrants(entrants, tournament["room_size"])
+        started_at = time.perf_counter()
+
+        game_ids = []
+        for batch_start in range(0, len(shards), self.batch_size):
+            for offset, shard in enumerate(shards[batch_start:batch_start + self.batch_size]):
+                game_id = f"{tournament['id']}-L{level}-R{batch_start + offset + 1}"
+                if len(shard) == 1:
+                    # Sala com um único jogador: passa direto para a próxima fase
+                    tournament["advancing"].append(shard[0])
+                    continue
+                await self._create_room(tournament, game_id, shard)
+                game_ids.append(game_id)
+            # Libera o event loop entre os lotes de criação de salas
+            await asyncio.sleep(0)
+
+        logger.info("🏟️ Torneio %s: fase %s com %s salas criadas em %.1fms",
+                    tournament["id"], level, len(game_ids), (time.perf_counter() - started_at) * 1000)
+
+        await self.sio.emit("game_event", {
+            "type": "tournament_level_started",
+            "tournament_id": tournament["id"],
+            "level": level,
+            "rooms": len(game_ids),
+            "players": len(entrants)
+        }, room=self._channel(tournament["id"]))
+
+        for index, game_id in enumerate(game_ids):
+            delay = self.start_window * index / len(game_ids)
+            self._spawn(self._start_room(game_id, delay))
+
+        if not game_ids:
+            await self._finish_level(tournament)
+
+    async def _create_room(self, tournament: dict, game_id: str, shard: list):
+        tournament["rooms"][game_id] = [sid for sid, _ in shard]
+        tournament["pending_rooms"].add(game_id)
+        self.room_to_tournament[game_id] = tournament["id"]
+        self.manager.reserve_room(game_id, tournament["id"])
+
+        for sid, player_name in shard:
+            session = await self.sio.get_session(sid)
+            previous_room = session.get("game_id") if session else None
+            if previous_room and previous_room in self.manager.rooms:
+                await self.manager.disconnect(previous_room, sid)
+                await self.sio.leave_room(sid, previous_room)
+            await self.manager.connect(game_id, sid, player_name)
+
+    async def _start_room(self, game_id: str, delay: float):
+        if delay:
+            # Relógio do motor: numa simulação o escalonamento segue o tempo virtual
+            await self.manager.clock.sleep(delay)
+        success, message = await self.manager.start_new_game(game_id)
+        if not success:
+            logger.warning("❌ Could not start tournament room %s: %s", game_id, message)
+
+    async def _finish_level(self, tournament: dict):
+        for game_id in tournament["rooms"]:
+            self.room_to_tournament.pop(game_id, None)
+        tournament["rooms"] = {}
+
+        advancing = tournament["advancing"]
+        if len(advancing) > 1:
+            await self._start_level(tournament, advancing)
+            return
+
+        tournament["state"] = "finished"
+        tournament["champion"] = advancing[0][1] if advancing else None
+        await self.sio.emit("game_event", {
+            "type": "tournament_finished",
+            "tournament_id": tournament["id"],
+            "champion": tournament["champion"],
+            "levels": tournament["level"]
+        }, room=self._channel(tournament["id"]))
+        del self.tournaments[tournament["id"]]
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _channel(tournament_id: str) -> str:
+        return f"tournament:{tournament_id}"
@@ -7,6 +7,36 @@ interface Player {
   name: string
   is_active: boolean
   is_host: boolean
+  score?: number
+}
+
+interface DictionaryManifest {
+  version: string
+  shards: Record<string, { path: string; words: number; bytes: number }>
+}
+
+// Conecta ao Socket.IO usando variável de ambiente VITE_SOCKET_URL (configurável no Vercel)
+// Fallback para localhost:8000 para desenvolvimento local
+const SOCKET_URL = (import.meta.env.VITE_SOCKET_URL as string) || 'http://localhost:8000'
+// Servidor atual: muda quando o worker da sala é drenado e manda o cliente para outro
+let serverUrl = SOCKET_URL
+
+// Mesmo mapeamento usado pelo backend para os rótulos das dificuldades
+const BACKEND_DIFFICULTY: Record<string, string> = {
+  'fácil': 'easy',
+  'normal': 'normal',
+  'difícil': 'caotic',
+  'fragmento': 'fragment'
+}
+
+function stripAccents(word: string): string {
+  return word.normalize('NFD').replace(/[\u0300-\u036f]/g, '')
+}
+
+// Primeira letra sem acento; o resto fica no shard "_" (igual ao servidor)
+function shardLetter(word: string): string {
+  const first = stripAccents(word.slice(0, 1).toLowerCase())
+  return first >= 'a' && first <= 'z' ? first : '_'
 }
 
 interface GameMessage {
@@ -37,8 +67,14 @@ export const useGameStore = defineStore('game', () => {
   // Configurações da sala
   const roomSettings = ref({
     defaultTime: 30, // tempo padrão em segundos
-    difficulty: 'normal' // fácil, normal, difícil
+    difficulty: 'normal', // fácil, normal, difícil
+    mode: 'elimination', // elimination, points ou speed
+    language: 'pt'
   })
+  // Modo da partida em andamento (vem do game_started); roomSettings.mode só vale para a próxima
+  const gameMode = ref<string>('elimination')
+  // Modo speed: todos podem enviar enquanto a rodada estiver aberta
+  const speedRoundOpen = ref<boolean>(false)
 
   // Timer state
   const remainingTime = ref<number>(0)
@@ -50,9 +86,20 @@ export const useGameStore = defineStore('game', () => {
   const messages = ref<GameMessage[]>([])
   const lastError = ref<string>('')
 
+  // Shards do dicionário (um por primeira letra) para pré-validar palavras sem ida ao servidor.
+  // Os arquivos são imutáveis (hash no nome), então o cache HTTP do navegador evita novos downloads.
+  let manifestPromise: Promise<DictionaryManifest | null> | null = null
+  let manifestKey = ''
+  const shardRequests = new Map<string, Promise<Set<string> | null>>()
+  const loadedShards = new Map<string, Set<string>>()
+
   // Computed
   const isConnected = computed(() => connected.value && socket.value?.disconnected === false)
   const isMyTurn = computed(() => {
+    if (gameMode.value === 'speed') {
+      const me = players.value.find(p => p.id === myPlayerId.value)
+      return speedRoundOpen.value && !!me?.is_active
+    }
     if (!currentPlayer.value || !myPlayerId.value) return false
     return currentPlayer.value.id === myPlayerId.value
   })
@@ -66,9 +113,10 @@ export const useGameStore = defineStore('game', () => {
     return me?.is_host || false
   })
 
-  // Conectar ao Socket.IO
-  function connect(gameIdParam: string, playerNameParam: string): void {
+  // Conectar ao Socket.IO (com rejoinId e o segredo do migrate, volta à sala migrada como o mesmo jogador)
+  function connect(gameIdParam: string, playerNameParam: string, rejoinId: string = '', rejoinSecret: string = ''): void {
     if (socket.value) {
+      socket.value.off('disconnect')
       socket.value.disconnect()
     }
 
@@ -78,11 +126,7 @@ export const useGameStore = defineStore('game', () => {
     // Limpar o nome pendente do localStorage
     localStorage.removeItem('pendingPlayerName')
 
-    // Conecta ao Socket.IO usando variável de ambiente VITE_SOCKET_URL (configurável no Vercel)
-    // Fallback para localhost:8000 para desenvolvimento local
-    const SOCKET_URL = (import.meta.env.VITE_SOCKET_URL as string) || 'http://localhost:8000'
-
-    socket.value = io(SOCKET_URL, {
+    socket.value = io(serverUrl, {
       transports: ['websocket', 'polling']
     })
 
@@ -90,6 +134,11 @@ export const useGameStore = defineStore('game', () => {
       console.log('🔌 Conectado ao Socket.IO')
       connected.value = true
 
+      if (rejoinId) {
+        socket.value?.emit('rejoin_game', { game_id: gameIdParam, player_id: rejoinId, rejoin_secret: rejoinSecret })
+        return
+      }
+
       // Enviar dados de entrada na sala
       console.log('📤 Enviando join_game:', { game_id: gameIdParam, player_name: playerNameParam })
       socket.value?.emit('join_game', {
@@ -177,15 +226,19 @@ export const useGameStore = defineStore('game', () => {
         nextLetterIndex.value = data.next_letter_index || 0
         players.value = data.players || []
         currentPlayer.value = data.current_player || null
+        gameMode.value = data.mode || data.room_settings?.mode || 'elimination'
         updateHostInfo(players.value)
 
         // Atualizar configurações da sala se fornecidas
         if (data.room_settings) {
           roomSettings.value.defaultTime = data.room_settings.default_time || 30
           roomSettings.value.difficulty = data.room_settings.difficulty || 'normal'
+          roomSettings.value.mode = data.room_settings.mode || 'elimination'
+          roomSettings.value.language = data.room_settings.language || 'pt'
           difficulty.value = data.room_settings.difficulty || 'normal'
           console.log('⚙️ Configurações da sala atualizadas (game_started):', roomSettings.value)
         }
+        prefetchShard(nextLetter.value)
 
         addMessage('Sistema', '🎮 Jogo iniciado!')
         break
@@ -202,7 +255,23 @@ export const useGameStore = defineStore('game', () => {
         players.value = data.players || []
         currentPlayer.value = data.current_player || null
         updateHostInfo(players.value)
-        addMessage(data.player || 'Alguém', data.word || '')
+        addMessage(data.player || 'Alguém', data.score ? `${data.word || ''} (+${data.score})` : data.word || '')
+        prefetchShard(nextLetter.value)
+        break
+
+      case 'speed_round_result':
+        speedRoundOpen.value = false
+        currentWord.value = data.current_word || ''
+        nextLetter.value = data.next_letter || ''
+        nextLetterIndex.value = data.next_letter_index || 0
+        players.value = data.players || []
+        prefetchShard(nextLetter.value)
+        if (data.winner) {
+          addMessage(data.winner, `${data.word} (+${data.score})`)
+          addMessage('Sistema', `⚡ ${data.winner} venceu a rodada!`)
+        } else {
+          addMessage('Sistema', '⏰ Ninguém acertou a tempo')
+        }
         break
 
       case 'player_eliminated':
@@ -248,23 +317,19 @@ export const useGameStore = defineStore('game', () => {
         if (data.settings) {
           roomSettings.value.defaultTime = data.settings.default_time || 30
           roomSettings.value.difficulty = data.settings.difficulty || 'normal'
+          roomSettings.value.mode = data.settings.mode || 'elimination'
 
           // Mapear dificuldade do backend para exibição
           const difficultyDisplay: Record<string, string> = {
             'easy': 'Fácil',
             'normal': 'Normal',
-            'caotic': 'Difícil'
+            'caotic': 'Difícil',
+            'fragment': 'Fragmento'
           }
 
           // Atualizar a dificuldade do jogo (para compatibilidade com sistema existente)
-          const backendDifficulty: Record<string, string> = {
-            'fácil': 'easy',
-            'normal': 'normal',
-            'difícil': 'caotic'
-          }
-
           const settingsDifficulty = data.settings.difficulty || 'normal'
-          difficulty.value = backendDifficulty[settingsDifficulty] || settingsDifficulty
+          difficulty.value = BACKEND_DIFFICULTY[settingsDifficulty] || settingsDifficulty
 
           const displayDiff = difficultyDisplay[difficulty.value] || settingsDifficulty
           addMessage('Sistema', `⚙️ Configurações atualizadas: ${data.settings.default_time}s, ${displayDiff}`)
@@ -290,9 +355,16 @@ export const useGameStore = defineStore('game', () => {
         const rejectedByPlayer = data.player || 'Alguém'
         addMessage(rejectedByPlayer, `${rejectedWord} ❌`)
         addMessage('Sistema', `❌ "${rejectedWord}" foi rejeitada: ${data.reason}`)
+        addSuggestions(data.suggestions)
+        break
+
+      case 'word_suggestions':
+        // Sugestões que chegam depois da rejeição (primeiro uso da letra no servidor)
+        addSuggestions(data.suggestions)
         break
 
       case 'timer_started':
+        speedRoundOpen.value = gameMode.value === 'speed'
         timerActive.value = true
         // Usar o tempo das configurações da sala se remaining_time não estiver disponível
         const startTime = data.remaining_time || roomSettings.value.defaultTime || 30
@@ -340,6 +412,40 @@ export const useGameStore = defineStore('game', () => {
         addMessage('Sistema', `🏆 Vitória! Vencedor: ${data.winner}`)
         break
 
+      case 'migrate':
+        // O servidor está sendo reiniciado: a sala (ou a entrada nela) continua em outro worker
+        serverUrl = data.url
+        addMessage('Sistema', '🚚 Trocando de servidor...')
+        connect(gameId.value, playerName.value, data.rejoin ? myPlayerId.value : '', data.rejoin_secret || '')
+        break
+
+      case 'rejoin_failed':
+        connect(gameId.value, playerName.value)
+        break
+
+      case 'room_state':
+        myPlayerId.value = data.player_id
+        gameStarted.value = data.game_state === 'playing'
+        currentWord.value = data.current_word || ''
+        nextLetter.value = data.next_letter || ''
+        nextLetterIndex.value = data.next_letter_index || 0
+        difficulty.value = data.difficulty || difficulty.value
+        gameMode.value = data.mode || gameMode.value
+        players.value = data.players || []
+        currentPlayer.value = data.current_player || null
+        updateHostInfo(players.value)
+        if (data.room_settings) {
+          roomSettings.value.defaultTime = data.room_settings.default_time || 30
+          roomSettings.value.difficulty = data.room_settings.difficulty || 'normal'
+          roomSettings.value.mode = data.room_settings.mode || 'elimination'
+          roomSettings.value.language = data.room_settings.language || 'pt'
+        }
+        break
+
+      case 'room_resumed':
+        addMessage('Sistema', `✅ Jogo retomado após ${Math.round(data.paused * 1000)}ms`)
+        break
+
       case 'game_reset':
         gameStarted.value = false
         isVictoryState.value = false
@@ -360,12 +466,85 @@ export const useGameStore = defineStore('game', () => {
     }
   }
 
+  // Manifest do dicionário da sala (recarregado quando idioma ou dificuldade mudam)
+  function loadManifest(): Promise<DictionaryManifest | null> {
+    const language = roomSettings.value.language || 'pt'
+    const listDifficulty = BACKEND_DIFFICULTY[difficulty.value] || difficulty.value
+    const key = `${language}/${listDifficulty}`
+    if (!manifestPromise || manifestKey !== key) {
+      manifestKey = key
+      shardRequests.clear()
+      loadedShards.clear()
+      manifestPromise = fetch(`${serverUrl}/dictionary/${key}/manifest.json`)
+        .then(response => response.ok ? response.json() : null)
+        .catch(() => null)
+    }
+    return manifestPromise
+  }
+
+  // Baixa (uma vez) o shard de uma letra; null se o servidor não puder servi-lo
+  function loadShard(letter: string): Promise<Set<string> | null> {
+    const manifestPromiseForShard = loadManifest()
+    const key = `${manifestKey}/${letter}`
+    let request = shardRequests.get(key)
+    if (!request) {
+      request = manifestPromiseForShard
+        .then(manifest => {
+          const shard = manifest?.shards[letter]
+          if (!shard) return manifest ? new Set<string>() : null
+          return fetch(`${serverUrl}${shard.path}`)
+            .then(response => response.ok ? response.text() : null)
+            .then(text => text === null ? null : new Set(text.split('\n').map(stripAccents)))
+        })
+        .catch(() => null)
+        .then(words => {
+          if (words) {
+            loadedShards.set(key, words)
+          } else {
+            // Falhou (ou o dicionário mudou de versão): tenta de novo com um manifest novo.
+            // Até lá o servidor valida sozinho.
+            shardRequests.delete(key)
+            manifestPromise = null
+          }
+          return words
+        })
+      shardRequests.set(key, request)
+    }
+    return request
+  }
+
+  // Pré-carrega o shard da letra esperada (no modo fragmento a primeira letra é desconhecida)
+  function prefetchShard(letter: string): void {
+    if (letter.length !== 1 || difficulty.value === 'fragment') return
+    loadShard(shardLetter(letter))
+  }
+
+  // true/false se o shard já está carregado; null se ainda não (o servidor decide)
+  function isKnownWord(word: string): boolean | null {
+    loadManifest()  // troca de shards se a sala mudou de idioma/dificuldade
+    const letter = shardLetter(word)
+    const words = loadedShards.get(`${manifestKey}/${letter}`)
+    if (!words) {
+      loadShard(letter)
+      return null
+    }
+    return words.has(stripAccents(word.toLowerCase()))
+  }
+
   // Enviar palavra
   function submitWord(word: string): void {
     if (!socket.value || !word.trim()) return
+    const trimmed = word.trim()
+
+    // Rejeição local só quando temos certeza: shard carregado e palavra ausente
+    if (isKnownWord(trimmed) === false) {
+      lastError.value = `"${trimmed}" não está no dicionário`
+      addMessage('Sistema', `❌ "${trimmed}" não está no dicionário`)
+      return
+    }
 
     socket.value.emit('submit_word', {
-      word: word.trim()
+      word: trimmed
     })
   }
 
@@ -396,6 +575,7 @@ export const useGameStore = defineStore('game', () => {
 
   // Resetar estado
   function resetState(): void {
+    serverUrl = SOCKET_URL
     connected.value = false
     gameId.value = ''
     players.value = []
@@ -421,13 +601,19 @@ export const useGameStore = defineStore('game', () => {
     })
   }
 
+  function addSuggestions(suggestions?: string[]): void {
+    if (suggestions && suggestions.length) {
+      addMessage('Sistema', `💡 Você quis dizer: ${suggestions.join(', ')}?`)
+    }
+  }
+
   // Limpar erro
   function clearError(): void {
     lastError.value = ''
   }
 
   // Funções de configuração
-  function updateRoomSettings(settings: { defaultTime?: number; difficulty?: string }): void {
+  function updateRoomSettings(settings: { defaultTime?: number; difficulty?: string; mode?: string }): void {
     console.log('📤 updateRoomSettings chamado com:', settings)
     console.log('📊 Estado atual roomSettings:', roomSettings.value)
 
@@ -439,6 +625,9 @@ export const useGameStore = defineStore('game', () => {
       roomSettings.value.difficulty = settings.difficulty
       console.log('⚙️ difficulty atualizada para:', settings.difficulty)
     }
+    if (settings.mode !== undefined) {
+      roomSettings.value.mode = settings.mode
+    }
 
     console.log('📊 Novo estado roomSettings:', roomSettings.value)
 
@@ -449,7 +638,8 @@ export const useGameStore = defineStore('game', () => {
         game_id: gameId.value,
         settings: {
           default_time: roomSettings.value.defaultTime,
-          difficulty: roomSettings.value.difficulty
+          difficulty: roomSettings.value.difficulty,
+          mode: roomSettings.value.mode
         }
       }
       console.log('🚀 Enviando configurações para servidor:', payload)
@@ -481,6 +671,7 @@ export const useGameStore = defineStore('game', () => {
     messages,
     lastError,
     roomSettings,
+    gameMode,
 
     // Timer state
     remainingTime,